@@ -1,4 +1,10 @@
-from src.yaml_editor import main
+import sys
+from pathlib import Path
+
+# The modules under src/ import each other by bare name, as they do when run as scripts.
+sys.path.insert(0, str(Path(__file__).parent / 'src'))
+
+from yaml_editor import main
 
 if __name__ == '__main__':
     main()
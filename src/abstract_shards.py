@@ -0,0 +1,91 @@
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator
+from paper_schema import Paper
+from utils import atomic_write
+
+SHARD_MODES = ('year', 'hash')
+
+# Shards of a 'hash' build; papers are spread over them by a hash of their id.
+HASH_BUCKETS = 16
+
+def has_abstract(paper: Paper) -> bool:
+    return bool(paper.abstract) and paper.abstract.lower() != 'none'
+
+def shard_key(paper: Paper, mode: str) -> str:
+    """Name of the shard holding the abstract of ``paper``."""
+    if mode == 'year':
+        return str(paper.year)
+    digest = hashlib.sha256(paper.id.encode('utf-8')).digest()
+    return f"{digest[0] % HASH_BUCKETS:02x}"
+
+class AbstractShards:
+    """Writes paper abstracts to JSON files next to the page instead of into it.
+
+    Each shard maps paper ids to abstracts and is named after a hash of its content
+    (abstracts/2024.1a2b3c4d5e.json), so it can be cached for as long as the browser
+    likes: a changed abstract gives its shard a new name. Abstracts are spooled to disk
+    per shard while the papers stream past, so only one shard is in memory at a time.
+    """
+
+    def __init__(self, output_dir: Path, mode: str):
+        if mode not in SHARD_MODES:
+            raise ValueError(f"Unknown abstract shard mode: {mode}")
+        self.directory = Path(output_dir) / 'abstracts'
+        self.mode = mode
+        self.files: Dict[str, str] = {}
+        self._spool = tempfile.TemporaryDirectory(prefix='abstract-shards-')
+        self._open: Dict[str, IO[str]] = {}
+
+    def add(self, paper: Paper) -> None:
+        if not has_abstract(paper):
+            return
+        key = shard_key(paper, self.mode)
+        f = self._open.get(key)
+        if f is None:
+            f = self._open[key] = open(Path(self._spool.name) / f"{len(self._open)}.jsonl",
+                                       'w', encoding='utf-8')
+        f.write(json.dumps([paper.id, paper.abstract], ensure_ascii=False) + '\n')
+
+    def tap(self, papers: Iterable[Paper]) -> Iterator[Paper]:
+        """Pass ``papers`` through unchanged, spooling each abstract on the way."""
+        for paper in papers:
+            self.add(paper)
+            yield paper
+
+    def write(self) -> Dict[str, str]:
+        """Write the shard files and return the URL of each shard, relative to the page."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            for key, f in sorted(self._open.items()):
+                f.close()
+                abstracts = {}
+                with open(f.name, encoding='utf-8') as spooled:
+                    for line in spooled:
+                        paper_id, abstract = json.loads(line)
+                        abstracts[paper_id] = abstract
+                content = json.dumps(abstracts, ensure_ascii=False, separators=(',', ':'))
+                digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+                name = f"{key}.{digest}.json"
+                path = self.directory / name
+                if not path.exists():
+                    with atomic_write(path) as out:
+                        out.write(content)
+                self.files[key] = f"abstracts/{name}"
+        finally:
+            self._spool.cleanup()
+        return self.files
+
+    def prune(self) -> int:
+        """Delete shard files the last write did not produce. Returns the number removed."""
+        current = {Path(url).name for url in self.files.values()}
+        removed = 0
+        for path in self.directory.iterdir():
+            # Precompressed copies (generate.py --compress) go with their shard.
+            name = path.name.removesuffix('.gz').removesuffix('.br')
+            if name.endswith('.json') and name not in current:
+                path.unlink()
+                removed += 1
+        return removed
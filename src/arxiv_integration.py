@@ -1,13 +1,15 @@
-import arxiv
-import yaml
 import re
 from urllib.parse import urlparse
 from typing import Optional, Dict, Any
 
+from yaml_loader import load_papers
+from arxiv_metadata import shared_resolver
+
 
 class ArxivIntegration:
     def __init__(self):
-        self.client = arxiv.Client()
+        # Shared with fix_date.YAMLUpdater, so the editor paces all its arXiv requests together
+        self.resolver = shared_resolver()
 
     def extract_arxiv_id(self, url_or_id: str) -> str:
         """Extract arXiv ID from URL or return the ID if already in correct format."""
@@ -30,16 +32,17 @@ class ArxivIntegration:
         """Fetch paper details from arXiv using its ID or URL."""
         try:
             arxiv_id = self.extract_arxiv_id(url_or_id)
-            search = arxiv.Search(id_list=[arxiv_id], max_results=1)
-            results = list(self.client.results(search))
-            if not results:
+            paper = self.resolver.get(arxiv_id)
+            if paper is None:
+                error = self.resolver.errors.get(arxiv_id)
+                if error:
+                    print(f"Error fetching from arXiv: {error}")
                 return None
-            paper = results[0]
-            first_author_last_name = paper.authors[0].name.split()[-1].lower()
+            first_author_last_name = paper.authors[0].split()[-1].lower()
             year = paper.published.year
             first_title_word = re.sub(r'[^\w\s]', '', paper.title.split()[0].lower())
             paper_id = f"{first_author_last_name}{year}{first_title_word}"
-            authors = ', '.join([author.name for author in paper.authors])
+            authors = ', '.join(paper.authors)
             entry = {
                 "id": paper_id,
                 "title": paper.title,
@@ -63,7 +66,7 @@ class ArxivIntegration:
         try:
             with open(filename, 'r', encoding='utf-8') as file:
                 content = file.read()
-            data = yaml.safe_load(content) or []
+            data = load_papers(filename) or []
             if any(existing['id'] == entry['id'] for existing in data):
                 print(f"Paper with ID {entry['id']} already exists")
                 return False
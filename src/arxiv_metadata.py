@@ -0,0 +1,161 @@
+"""Batched arXiv metadata lookups for fix_date.py and the editor's importer.
+
+Asking the arXiv API about one paper per request costs a request (and a politeness delay)
+per entry, and a backfill of a few thousand entries gets throttled long before it
+finishes. The resolver instead asks for up to ``MAX_BATCH`` ids per request through a
+single client that paces every request it makes, and hands each entry its own record.
+"""
+import re
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+import arxiv
+
+if TYPE_CHECKING:
+    from metadata_cache import MetadataCache
+
+# Ids per API request. The API serves id_list queries of this size in one page; much
+# longer lists make the query URL unwieldy.
+MAX_BATCH = 400
+
+# arXiv asks API clients to wait 3 seconds between requests.
+REQUEST_DELAY = 3.0
+
+_VERSION_RE = re.compile(r'v(\d+)$')
+
+def split_version(arxiv_id: str):
+    """'2412.21206v2' -> ('2412.21206', 2); an id without a version gives None."""
+    match = _VERSION_RE.search(arxiv_id)
+    if not match:
+        return arxiv_id, None
+    return arxiv_id[:match.start()], int(match.group(1))
+
+@dataclass
+class ArxivRecord:
+    """The metadata this repo uses from one arXiv paper version."""
+    arxiv_id: str  # without version, e.g. 2412.21206
+    version: int
+    title: str
+    authors: List[str]
+    summary: str
+    published: datetime  # first version
+    updated: datetime    # this version
+    pdf_url: str
+
+    @classmethod
+    def from_result(cls, result: 'arxiv.Result') -> 'ArxivRecord':
+        base, version = split_version(result.get_short_id())
+        return cls(
+            arxiv_id=base,
+            version=version or 1,
+            title=result.title,
+            authors=[author.name for author in result.authors],
+            summary=result.summary,
+            published=result.published,
+            updated=result.updated,
+            pdf_url=result.pdf_url or f"https://arxiv.org/pdf/{base}",
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['published'] = self.published.isoformat()
+        data['updated'] = self.updated.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ArxivRecord':
+        return cls(**{**data,
+                      'published': datetime.fromisoformat(data['published']),
+                      'updated': datetime.fromisoformat(data['updated'])})
+
+class ArxivMetadataResolver:
+    """Looks up many arXiv ids in as few paced requests as possible."""
+
+    def __init__(self, client: Optional[arxiv.Client] = None, batch_size: int = MAX_BATCH,
+                 cache: Optional['MetadataCache'] = None):
+        self.batch_size = batch_size
+        self.cache = cache
+        self.client = client or arxiv.Client(page_size=batch_size, delay_seconds=REQUEST_DELAY,
+                                             num_retries=3)
+        # arxiv.Client paces requests per instance but is not thread-safe; every request
+        # goes through this lock so concurrent callers still queue behind one delay.
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors: Dict[str, str] = {}
+
+    def resolve(self, arxiv_ids: Iterable[str]) -> Dict[str, ArxivRecord]:
+        """Records for the given ids, keyed by the id as asked for.
+
+        An id with a version gets that version; one without gets the latest. Ids arXiv
+        does not know are missing from the result, and ids whose lookup failed are
+        listed in ``errors``. Ids the cache holds are not requested again.
+        """
+        wanted = list(dict.fromkeys(i for i in arxiv_ids if i))
+        for arxiv_id in wanted:
+            self.errors.pop(arxiv_id, None)
+        found: Dict[str, ArxivRecord] = self.cache.get_many(wanted) if self.cache else {}
+        missing = [i for i in wanted if i not in found]
+        for start in range(0, len(missing), self.batch_size):
+            try:
+                self._resolve_batch(missing[start:start + self.batch_size], found)
+            except Exception as e:
+                # arXiv is down, unreachable or throttling us, and the client has already
+                # retried; asking again at once would only add load. Every id still
+                # unresolved is reported as failed.
+                for arxiv_id in missing[start:]:
+                    if arxiv_id not in found:
+                        self.errors.setdefault(arxiv_id, str(e))
+                break
+        return found
+
+    def get(self, arxiv_id: str) -> Optional[ArxivRecord]:
+        return self.resolve([arxiv_id]).get(arxiv_id)
+
+    def _fetch(self, batch: List[str]) -> List[ArxivRecord]:
+        search = arxiv.Search(id_list=batch, max_results=len(batch))
+        with self._lock:
+            self.requests += 1
+            return [ArxivRecord.from_result(r) for r in self.client.results(search)]
+
+    def _resolve_batch(self, batch: List[str], found: Dict[str, ArxivRecord]) -> None:
+        try:
+            records = self._fetch(batch)
+        except arxiv.HTTPError as e:
+            # One id arXiv rejects fails the whole query with 400 Bad Request; halve the
+            # batch to isolate it. Any other error is left to resolve.
+            if e.status != 400:
+                raise
+            if len(batch) == 1:
+                self.errors[batch[0]] = str(e)
+                return
+            middle = len(batch) // 2
+            self._resolve_batch(batch[:middle], found)
+            self._resolve_batch(batch[middle:], found)
+            return
+        by_version = {f"{r.arxiv_id}v{r.version}": r for r in records}
+        # An id without a version was answered with the latest, the highest one returned
+        by_id = {r.arxiv_id: r for r in sorted(records, key=lambda r: r.version)}
+        latest = []
+        for requested in batch:
+            base, version = split_version(requested)
+            record = by_version.get(requested) or by_id.get(base)
+            if record is not None:
+                found[requested] = record
+                if version is None:
+                    latest.append(record)
+        if self.cache:
+            self.cache.put_many(records)
+            self.cache.put_many(latest, latest=True)
+
+_shared: Optional[ArxivMetadataResolver] = None
+_shared_lock = threading.Lock()
+
+def shared_resolver() -> ArxivMetadataResolver:
+    """The process-wide resolver, so every caller shares one paced client and the cache."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            from metadata_cache import MetadataCache
+            _shared = ArxivMetadataResolver(cache=MetadataCache())
+        return _shared
@@ -0,0 +1,68 @@
+"""Reads arXiv metadata from a local copy of the public arXiv metadata snapshot.
+
+The snapshot (arxiv-metadata-oai-snapshot.json, distributed through Kaggle) is one JSON
+object per line, one line per paper, several GB in all. It is streamed once; only lines
+whose id is wanted are parsed, and only their records are kept.
+"""
+import json
+import os
+import re
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Optional
+
+from arxiv_metadata import ArxivRecord, split_version
+
+# The id is the first field of every line; matching it on the raw bytes skips the JSON
+# parse for the millions of papers nobody asked about.
+_ID_RE = re.compile(rb'"id"\s*:\s*"([^"]+)"')
+
+def record_from_snapshot(item: Dict) -> ArxivRecord:
+    versions = item['versions']
+    authors = [' '.join(part for part in (first, last, *rest) if part)
+               for last, first, *rest in item.get('authors_parsed') or []]
+    return ArxivRecord(
+        arxiv_id=item['id'],
+        version=int(versions[-1]['version'].lstrip('v')),
+        title=' '.join(item.get('title', '').split()),
+        authors=authors,
+        summary=item.get('abstract', '').strip(),
+        published=parsedate_to_datetime(versions[0]['created']),
+        updated=parsedate_to_datetime(versions[-1]['created']),
+        pdf_url=f"https://arxiv.org/pdf/{item['id']}",
+    )
+
+def read_snapshot(path: str, arxiv_ids: Iterable[str],
+                  progress_step: Optional[float] = 0.05) -> Dict[str, ArxivRecord]:
+    """Records for ``arxiv_ids`` found in the snapshot at ``path``, keyed by the id as asked for.
+
+    The snapshot holds each paper's latest version, which is what an id with a version
+    gets too. Progress is printed every ``progress_step`` of the file (None for quiet).
+    """
+    by_base: Dict[bytes, list] = {}
+    for requested in arxiv_ids:
+        by_base.setdefault(split_version(requested)[0].encode('ascii'), []).append(requested)
+    found: Dict[str, ArxivRecord] = {}
+    if not by_base:
+        return found
+    wanted = len(by_base)
+    total = os.path.getsize(path)
+    next_report = progress_step
+    done = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            done += len(line)
+            if progress_step and done >= next_report * total:
+                print(f"Scanned {done / 2**20:,.0f} of {total / 2**20:,.0f} MB, "
+                      f"found {wanted - len(by_base)} of {wanted} papers")
+                while next_report * total <= done:
+                    next_report += progress_step
+            match = _ID_RE.search(line, 0, 64)
+            requested = match and by_base.pop(match.group(1), None)
+            if not requested:
+                continue
+            record = record_from_snapshot(json.loads(line))
+            for arxiv_id in requested:
+                found[arxiv_id] = record
+            if not by_base:
+                break
+    return found
@@ -0,0 +1,105 @@
+import hashlib
+import re
+from pathlib import Path
+from typing import List, Optional, Set
+from utils import atomic_write, read_files
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCT_RE = re.compile(r'\s*([{};,])\s*')
+_JS_BACKTICK_RE = re.compile(r'(?<!\\)`')
+_BUNDLE_RE = re.compile(r'^(app|worker)\.[0-9a-f]{10}\.(css|js)$')
+
+def minify_css(source: str) -> str:
+    """Drop comments and redundant whitespace; nothing that could change a rule's meaning."""
+    css = _CSS_SPACE_RE.sub(' ', _CSS_COMMENT_RE.sub('', source))
+    return _CSS_PUNCT_RE.sub(r'\1', css).replace(';}', '}').strip()
+
+def minify_js(source: str) -> str:
+    """Drop indentation, blank lines and whole-line // comments.
+
+    Line breaks are kept, so automatic semicolon insertion sees the same code. Lines that
+    begin inside a multi-line template literal are kept verbatim, since they are part of
+    a string. This is line-based, not a parser: a backtick inside a quoted string, a
+    regex or a comment throws off its tracking of template literals, and /* */ comments
+    are left in.
+    """
+    kept = []
+    in_template = False
+    for line in source.splitlines():
+        if in_template:
+            kept.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('//'):
+                kept.append(stripped)
+            else:
+                continue
+        if len(_JS_BACKTICK_RE.findall(line)) % 2:
+            in_template = not in_template
+    return '\n'.join(kept)
+
+class PageAssets:
+    """The page's <style> and <script> markup, inlined or as fingerprinted bundles.
+
+    Inlined, every daily rebuild of the paper list makes returning visitors download all
+    CSS and JS again. With an output directory the CSS and JS are instead minified into
+    static/app.<hash>.css and static/app.<hash>.js next to the page, named after their
+    content, so they can be cached for months and only change when the code does. The
+    filter worker gets its own bundle of the engine and its entry point.
+    """
+
+    def __init__(self, base_dir: Path, output_dir: Optional[Path] = None):
+        self.base_dir = Path(base_dir)
+        self.directory = Path(output_dir) / 'static' if output_dir is not None else None
+        self.written: Set[str] = set()
+
+    def _read(self, files: List[str]) -> str:
+        return '\n'.join(read_files(self.base_dir, files))
+
+    def _bundle(self, name: str, ext: str, content: str) -> str:
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+        filename = f"{name}.{digest}.{ext}"
+        path = self.directory / filename
+        if not path.exists():
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with atomic_write(path) as f:
+                f.write(content)
+        self.written.add(filename)
+        return f"static/{filename}"
+
+    def styles(self, css_files: List[str]) -> str:
+        css = self._read(css_files)
+        if self.directory is None:
+            return f'<style>\n        {css}\n    </style>'
+        return f'<link rel="stylesheet" href="{self._bundle("app", "css", minify_css(css))}">'
+
+    def scripts(self, engine_files: List[str], worker_files: List[str], page_files: List[str]) -> str:
+        """Scripts for the end of <body>.
+
+        Inlined, the filter worker is started from the engine's and its own source text
+        (filterRunner in filters.js); bundled, from its own file named in data-src.
+        """
+        engine, worker, page = (self._read(engine_files), self._read(worker_files),
+                                self._read(page_files))
+        if self.directory is None:
+            return (f'<script id="filter-engine">\n        {engine}\n    </script>\n'
+                    f'    <script type="text/js-worker" id="filter-worker">\n        {worker}\n    </script>\n'
+                    f'    <script>\n        {page}\n    </script>')
+        worker_url = self._bundle('worker', 'js', minify_js(f"{engine}\n{worker}"))
+        app_url = self._bundle('app', 'js', minify_js(f"{engine}\n{page}"))
+        return (f'<script type="text/js-worker" id="filter-worker" data-src="{worker_url}"></script>\n'
+                f'    <script src="{app_url}"></script>')
+
+    def prune(self) -> int:
+        """Delete bundles this build did not write. Returns the number removed."""
+        if self.directory is None or not self.directory.is_dir():
+            return 0
+        removed = 0
+        for path in self.directory.iterdir():
+            # Precompressed copies (generate.py --compress) go with their bundle.
+            name = path.name.removesuffix('.gz').removesuffix('.br')
+            if _BUNDLE_RE.match(name) and name not in self.written:
+                path.unlink()
+                removed += 1
+        return removed
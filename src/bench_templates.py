@@ -0,0 +1,42 @@
+"""Microbenchmark: compiled card template against string.Template.substitute.
+
+Card rendering is the innermost loop of the site build, so this times exactly that step
+on the real database: the per-paper contexts are built once up front and each engine
+renders every card from them.
+
+Usage: python src/bench_templates.py [input_yaml] [--repeat N]
+"""
+import argparse
+import timeit
+from pathlib import Path
+from helper import papers_from_entries
+from paper_generator import PaperCardGenerator
+from template_engine import TemplateEngine
+from yaml_loader import load_papers
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input_yaml', nargs='?', default='awesome_3dgs_papers.yaml')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    template_path = Path(__file__).parent / 'templates' / 'paper_card.html'
+    generator = PaperCardGenerator(template_path.parent)
+    contexts = [generator.card_context(p) for p in papers_from_entries(load_papers(args.input_yaml))]
+
+    substitute = TemplateEngine(template_path, compiled=False)
+    compiled = TemplateEngine(template_path, compiled=True)
+    if [substitute.render(c) for c in contexts] != [compiled.render(c) for c in contexts]:
+        raise SystemExit("Compiled output differs from string.Template output")
+
+    results = {}
+    for label, engine in (('substitute', substitute), ('compiled', compiled)):
+        timer = timeit.Timer(lambda: [engine.render(c) for c in contexts])
+        best = min(timer.repeat(repeat=args.repeat, number=1))
+        results[label] = best
+        print(f"{label:>10}: {best * 1e3:8.2f} ms for {len(contexts)} cards "
+              f"({best / len(contexts) * 1e6:.2f} µs/card)")
+    print(f"   speedup: {results['substitute'] / results['compiled']:.2f}x")
+
+if __name__ == "__main__":
+    main()
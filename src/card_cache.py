@@ -0,0 +1,74 @@
+import hashlib
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable, Optional, Set
+from paper_schema import Paper
+from utils import atomic_write
+
+class CardCache:
+    """On-disk cache of rendered paper cards.
+
+    Each card is stored under a hash of the paper's fields and of everything else that
+    shapes its markup: the card template and the generator code that fills it. Editing one
+    YAML entry therefore invalidates one card, while touching the template or the
+    generator invalidates all of them. Cards of each variant live in their own directory,
+    so a build of one variant neither evicts nor prunes the cards of another.
+    """
+
+    def __init__(self, cache_dir: Path, *sources: Path):
+        self.cache_dir = Path(cache_dir)
+        digest = hashlib.sha256()
+        for source in sources:
+            digest.update(Path(source).read_bytes())
+        self.salt = digest.hexdigest()
+        self.hits = 0
+        self.misses = 0
+        self._used: Set[str] = set()
+
+    def key(self, paper: Paper, variant: str = '') -> str:
+        """Cache key of a card; ``variant`` names build options that change the markup."""
+        payload = json.dumps(asdict(paper), sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(f"{self.salt}\n{payload}".encode('utf-8')).hexdigest()
+        return f"{variant or 'default'}/{digest}"
+
+    def _path(self, key: str) -> Path:
+        variant, digest = key.split('/')
+        # Two-level fan-out keeps directories small once the corpus reaches tens of thousands of papers.
+        return self.cache_dir / variant / digest[:2] / f"{digest}.html"
+
+    def get(self, key: str) -> Optional[str]:
+        self._used.add(key)
+        try:
+            html = self._path(key).read_text(encoding='utf-8')
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return html
+
+    def put(self, key: str, html: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_write(path) as f:
+            f.write(html)
+
+    def prune(self) -> int:
+        """Delete cached cards of the variants the last build rendered that it did not use.
+
+        Cards of other variants are kept, and a build that rendered no cards removes
+        nothing. Returns the number removed.
+        """
+        removed = 0
+        for variant in {key.split('/')[0] for key in self._used}:
+            for path in self._iter_files(variant):
+                if f"{variant}/{path.stem}" not in self._used:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+    def _iter_files(self, variant: str) -> Iterable[Path]:
+        directory = self.cache_dir / variant
+        if not directory.is_dir():
+            return []
+        return list(directory.glob('??/*.html'))
@@ -2,22 +2,35 @@
 
 The PR validator only inspects entries changed in that PR, so a link that rots
 after it was merged is never looked at again. This walks the whole file.
+
+A sweep can be split over several runners: `--shard 2/4` checks the quarter of the
+URLs that hash to shard 2 and writes its findings as JSON, and
+`check_links.py merge link-shard-*.json` turns the shard files into the usual
+link-report.md. Per-host concurrency, rate and burst are divided between the shards,
+so up to PER_HOST_LIMIT shards together are no harder on any host than a single sweep.
+Each shard still keeps one probe in flight per host, so with more shards than that a
+host can see one probe per shard at once, though never more than the usual rate.
 """
+import argparse
+import hashlib
+import json
 import os
 import re
 import sys
 import time
-import yaml
+from dataclasses import replace
+from typing import Optional
 import requests
-from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from host_profile import BLOCKED_CODES, HostProfile, HostProfiles
+from link_sweep import (GLOBAL_LIMIT, HOST_BURST, HOST_RATE, PER_HOST_LIMIT, SweepEngine,
+                        canonical_url, host_of)
+from url_status import DEFAULT_PATH, UrlStatus, UrlStatusStore
+from yaml_loader import load_papers
 
 URL_FIELDS = ['paper', 'project_page', 'code', 'video']
-WORKERS = 8
 TIMEOUT = 25
 
-# 403 and 429 are overwhelmingly bot protection rather than a rotten link, so
-# they are listed separately instead of being reported as broken.
-BLOCKED_CODES = {401, 403, 429}
 OK_CODES = {200, 201, 202, 203, 204, 206, 300, 301, 302, 303, 304, 307, 308}
 
 HEADERS = {
@@ -28,6 +41,11 @@ HEADERS = {
 
 session = requests.Session()
 session.headers.update(HEADERS)
+# A pool per host large enough for every probe in flight, and enough pools that hosts
+# swept earlier keep their kept-alive connections (the default keeps 10 hosts).
+adapter = HTTPAdapter(pool_connections=256, pool_maxsize=GLOBAL_LIMIT)
+session.mount('http://', adapter)
+session.mount('https://', adapter)
 
 
 def collect(entries):
@@ -53,29 +71,105 @@ def collect(entries):
     return targets, malformed
 
 
-def probe(url):
+def probe(url, known: Optional[UrlStatus] = None,
+          profiles: Optional[HostProfiles] = None, timeout: float = TIMEOUT) -> UrlStatus:
+    """Probe ``url``; when it worked last time, ask only whether it changed since.
+
+    With host profiles, hosts known to answer HEAD differently from GET get the GET
+    straight away.
+    """
+    headers = {}
+    if known is not None and known.status in OK_CODES:
+        if known.etag:
+            headers['If-None-Match'] = known.etag
+        if known.last_modified:
+            headers['If-Modified-Since'] = known.last_modified
+    host = host_of(url)
+    profile = profiles.get(host) if profiles else HostProfile(host)
     try:
-        r = session.head(url, timeout=TIMEOUT, allow_redirects=True)
-        if r.status_code not in OK_CODES:
-            r = session.get(url, timeout=TIMEOUT, allow_redirects=True, stream=True)
+        head_status = None
+        if profile.use_head():
+            r = session.head(url, timeout=timeout, allow_redirects=True, headers=headers)
+            head_status = r.status_code
+            if profiles:
+                profiles.record(host, r.elapsed.total_seconds(),
+                                head_ok=True if head_status in OK_CODES else None)
+        if head_status not in OK_CODES:
+            r = session.get(url, timeout=timeout, allow_redirects=True, stream=True,
+                            headers=headers)
             r.close()
-        return r.status_code
+            if profiles:
+                # A HEAD that disagrees with the GET is of no use on this host.
+                profiles.record(host, r.elapsed.total_seconds(),
+                                head_ok=None if head_status is None else r.status_code == head_status,
+                                blocked=r.status_code in BLOCKED_CODES)
     except requests.RequestException as e:
-        return type(e).__name__
+        return UrlStatus(url, type(e).__name__, checked_at=time.time())
+    if r.status_code == 304 and headers:
+        return replace(known, checked_at=time.time())
+    return UrlStatus(url, r.status_code, r.url, r.headers.get('ETag'),
+                     r.headers.get('Last-Modified'), time.time())
+
+
+def shard_of(key, count):
+    """Shard (1..count) of a URL; the same on every run, machine and Python version."""
+    digest = hashlib.sha256(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+
+def parse_shard(text):
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected I/N, e.g. 2/4, not {text!r}')
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f'shard {index} is not between 1 and {count}')
+    return index, count
+
 
+def check(targets, store=None, max_age=0, profiles=None, adaptive_timeouts=True, hedge=False,
+          shards=1):
+    """Probe the targets; with a store, URLs found working within ``max_age`` seconds are not probed.
 
-def check(targets):
-    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
-        results = list(pool.map(lambda t: (t, probe(t[2])), targets))
+    Many papers link the same org page, channel or project site, so each URL is probed
+    once per canonical spelling and the result is fanned back out to every target.
+    """
+    probe_url = {}
+    for _, _, url in targets:
+        probe_url.setdefault(canonical_url(url), url)
+    known = store.get_many(probe_url) if store else {}
+    fresh = {key: s for key, s in known.items() if s.status in OK_CODES and s.age() < max_age}
+    stale = [key for key in probe_url if key not in fresh]
 
-    # Retry anything that failed, serially and spaced out, so that a rate limit
-    # or a blip during the parallel pass is not reported as a broken link.
-    confirmed = []
-    for target, status in results:
-        if status in OK_CODES:
-            continue
-        time.sleep(1)
-        confirmed.append((target, probe(target[2])))
+    # Anything that fails is retried after a pause on its own host, so that a rate
+    # limit or a blip during the sweep is not reported as a broken link. Hosts that
+    # blocked us on a recent run are not asked twice.
+    hosts = {host_of(url) for url in probe_url.values()}
+    blocking = set()
+    if profiles:
+        blocking = {host for host in hosts if profiles.get(host).blocking()}
+
+    def is_final(result):
+        return (result.status in OK_CODES
+                or result.status in BLOCKED_CODES and host_of(result.url) in blocking)
+
+    engine = SweepEngine(lambda key, timeout: probe(probe_url[key], known.get(key), profiles, timeout),
+                         is_final, adaptive_timeouts=adaptive_timeouts, hedge=hedge,
+                         timeout=TIMEOUT, per_host=max(1, PER_HOST_LIMIT // shards),
+                         host_rate=HOST_RATE / shards, host_burst=max(1.0, HOST_BURST / shards),
+                         latencies={h: profiles.get(h).latencies for h in hosts} if profiles else None)
+    results = engine.run(stale)
+    if store:
+        store.put_many(replace(result, url=key) for key, result in results.items())
+    if profiles:
+        profiles.save()
+    print(f'Probed {len(stale)} of {len(probe_url)} distinct URLs; '
+          f'{len(fresh)} were checked recently')
+    print(engine.summary())
+
+    statuses = {key: result.status for key, result in {**fresh, **results}.items()}
+    confirmed = [(t, statuses[canonical_url(t[2])]) for t in targets
+                 if statuses[canonical_url(t[2])] not in OK_CODES]
 
     dead = [(t, s) for t, s in confirmed if s not in OK_CODES and s not in BLOCKED_CODES]
     blocked = [(t, s) for t, s in confirmed if s in BLOCKED_CODES]
@@ -114,16 +208,8 @@ def report(malformed, dead, blocked, total):
     return '\n'.join(lines)
 
 
-def main():
-    with open('awesome_3dgs_papers.yaml', encoding='utf-8') as f:
-        entries = yaml.safe_load(f)
-
-    targets, malformed = collect(entries)
-    print(f'Checking {len(targets)} URLs from {len(entries)} papers '
-          f'({len(malformed)} malformed, not checked)')
-
-    dead, blocked = check(targets)
-    body = report(malformed, dead, blocked, len(targets))
+def write_report(malformed, dead, blocked, total):
+    body = report(malformed, dead, blocked, total)
     print(body)
 
     with open('link-report.md', 'w', encoding='utf-8') as f:
@@ -136,5 +222,92 @@ def main():
             f.write(f'dead={len(dead)}\n')
 
 
+def write_shard(path, shard, targets, malformed, dead, blocked):
+    """Write one shard's findings, each with its position in the whole sweep so that
+    merge can restore the order of an unsharded report."""
+    target_index = {t: k for k, t in targets}
+    result = {
+        'shard': list(shard),
+        'total': len(targets),
+        'malformed': [[k, *m] for k, m in malformed],
+        'dead': [[target_index[t], *t, status] for t, status in dead],
+        'blocked': [[target_index[t], *t, status] for t, status in blocked],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=1)
+    print(f'Wrote shard {shard[0]}/{shard[1]} results to {path}')
+
+
+def merge(paths):
+    """Combine shard results into link-report.md and the workflow outputs."""
+    shards, total = {}, 0
+    malformed, dead, blocked = [], [], []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            result = json.load(f)
+        index, count = result['shard']
+        shards.setdefault(count, set()).add(index)
+        total += result['total']
+        malformed += result['malformed']
+        dead += result['dead']
+        blocked += result['blocked']
+    count = max(shards) if shards else 0
+    if len(shards) != 1 or shards[count] != set(range(1, count + 1)):
+        found = ', '.join(f'{i}/{n}' for n, indexes in sorted(shards.items()) for i in sorted(indexes))
+        print(f'Error: expected shards 1/N to N/N of one sweep, got {found or "none"}')
+        return 1
+
+    def unpack(rows):
+        return [((pid, field, url), status) for _, pid, field, url, status in sorted(rows)]
+
+    write_report([tuple(m) for _, *m in sorted(malformed)], unpack(dead), unpack(blocked), total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep every URL in the paper database')
+    parser.add_argument('--store', default=str(DEFAULT_PATH),
+                        help='SQLite file recording the last status of every URL and what '
+                             'each host is like to probe')
+    parser.add_argument('--max-age', type=float, default=0, metavar='DAYS',
+                        help='Skip URLs found working within this many days (default: probe all)')
+    parser.add_argument('--adaptive-timeouts', action=argparse.BooleanOptionalAction, default=True,
+                        help='Give each host a timeout from its observed p95 latency '
+                             f'(at most {TIMEOUT}s) instead of a flat {TIMEOUT}s')
+    parser.add_argument('--hedge', action='store_true',
+                        help="Send a second request once the first has run past the host's "
+                             'p95 latency, and take whichever answers first')
+    parser.add_argument('--shard', type=parse_shard, metavar='I/N',
+                        help='Check only the URLs of shard I of N and write the results as JSON')
+    parser.add_argument('--output', metavar='JSON',
+                        help='Where --shard writes its results (default: link-shard-I-of-N.json)')
+    commands = parser.add_subparsers(dest='command')
+    merge_parser = commands.add_parser('merge', help='Combine the JSON results of a sharded '
+                                                     'sweep into link-report.md')
+    merge_parser.add_argument('results', nargs='+', help='JSON files written by --shard')
+    args = parser.parse_args()
+
+    if args.command == 'merge':
+        return merge(args.results)
+
+    entries = load_papers('awesome_3dgs_papers.yaml')
+
+    targets, malformed = collect(entries)
+    index, count = args.shard or (1, 1)
+    targets = [(k, t) for k, t in enumerate(targets) if shard_of(canonical_url(t[2]), count) == index]
+    malformed = [(k, m) for k, m in enumerate(malformed) if shard_of(m[2], count) == index]
+    shard = f' in shard {index}/{count}' if args.shard else ''
+    print(f'Checking {len(targets)} URLs{shard} from {len(entries)} papers '
+          f'({len(malformed)} malformed, not checked)')
+
+    store = UrlStatusStore(args.store)
+    dead, blocked = check([t for _, t in targets], store, args.max_age * 86400,
+                          HostProfiles(args.store), args.adaptive_timeouts, args.hedge, count)
+    if args.shard:
+        write_shard(args.output or f'link-shard-{index}-of-{count}.json', args.shard,
+                    targets, malformed, dead, blocked)
+    else:
+        write_report([m for _, m in malformed], dead, blocked, len(targets))
+
+
 if __name__ == '__main__':
     sys.exit(main())
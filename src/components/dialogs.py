@@ -1,11 +1,10 @@
-import arxiv
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                            QHBoxLayout, QLabel, QLineEdit, QPushButton,
                            QMessageBox, QTextEdit, QScrollArea, QListWidget,
                            QGridLayout, QDialog)
 import logging
-from src.arxiv_integration import ArxivIntegration
-from src.components.thumbnail import ThumbnailGenerator
+from arxiv_integration import ArxivIntegration
+from components.thumbnail import ThumbnailGenerator
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +15,6 @@ class ArxivAddDialog(QDialog):
         self.setup_ui()
         self.arxiv = ArxivIntegration()
         self.thumbnail_generator = ThumbnailGenerator()
-        self.client = arxiv.Client()
         
     def setup_ui(self):
         layout = QVBoxLayout(self)
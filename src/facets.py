@@ -0,0 +1,51 @@
+import base64
+from typing import Dict, Iterable, Iterator
+from paper_schema import Paper
+from utils import script_json
+
+class FacetIndex:
+    """One bitset per tag and per year, over the papers in page order.
+
+    Bit ``i`` of a facet is set when the i-th paper on the page has that tag or year, so
+    the page filters by ANDing a few bitsets instead of checking every paper's tag list.
+    Bitsets are written as base64 of little-endian 32-bit words, which decodes straight
+    into a Uint32Array.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.tags: Dict[str, bytearray] = {}
+        self.years: Dict[str, bytearray] = {}
+
+    def add(self, paper: Paper) -> None:
+        ordinal = self.count
+        self.count += 1
+        for tag in paper.tags:
+            _set_bit(self.tags.setdefault(tag, bytearray()), ordinal)
+        _set_bit(self.years.setdefault(str(paper.year), bytearray()), ordinal)
+
+    def tap(self, papers: Iterable[Paper]) -> Iterator[Paper]:
+        """Pass ``papers`` through unchanged, recording each one's facets on the way."""
+        for paper in papers:
+            self.add(paper)
+            yield paper
+
+    def _encode(self, bits: bytearray) -> str:
+        size = (self.count + 31) // 32 * 4
+        return base64.b64encode(bytes(bits).ljust(size, b'\0')).decode('ascii')
+
+    def to_json(self) -> dict:
+        return {
+            'count': self.count,
+            'tags': {t: self._encode(self.tags[t]) for t in sorted(self.tags)},
+            'years': {y: self._encode(self.years[y]) for y in sorted(self.years)},
+        }
+
+    def script(self) -> str:
+        return f'<script type="application/json" id="facet-index">{script_json(self.to_json())}</script>'
+
+def _set_bit(bits: bytearray, i: int) -> None:
+    byte = i >> 3
+    if byte >= len(bits):
+        bits.extend(bytes(byte + 1 - len(bits)))
+    bits[byte] |= 1 << (i & 7)
@@ -1,15 +1,78 @@
+import argparse
+import json
+import os
 import yaml
-import arxiv
 import time
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from yaml_loader import load_papers
+from arxiv_metadata import ArxivRecord, shared_resolver
+from arxiv_snapshot import read_snapshot
+from utils import atomic_write
+
+# Fields process_paper fills in, and so the ones the checkpoint journal records
+JOURNAL_FIELDS = ('publication_date', 'date_source')
+
+class CheckpointJournal:
+    """Append-only JSON-lines record of the entries a fix_date run has finished.
+
+    Every entry that got its date is written as soon as it is processed, so an
+    interrupted backfill loses at most the entry in flight; ``replay`` applies the
+    recorded results to a freshly loaded list on resume. Entries that failed are not
+    recorded, so a resumed run tries them again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def replay(self, data: List[Dict[str, Any]]) -> set:
+        """Apply recorded results to ``data``; returns the ids of the finished entries."""
+        by_id = {entry.get('id'): entry for entry in data}
+        finished = set()
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    done = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # the line being written when the run stopped
+                finished.add(done['id'])
+                entry = by_id.get(done['id'])
+                if entry is not None:
+                    entry.update({k: done[k] for k in JOURNAL_FIELDS if k in done})
+        return finished
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        done = {'id': entry.get('id'), **{k: entry[k] for k in JOURNAL_FIELDS if k in entry}}
+        self._file.write(json.dumps(done, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def sync(self) -> None:
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+
+    def remove(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.exists():
+            os.remove(self.path)
 
 class YAMLUpdater:
     def __init__(self):
-        self.client = arxiv.Client()
+        self.resolver = shared_resolver()
         self.failed_papers = []
+        # arXiv records fetched ahead of process_paper, keyed by arXiv id; None when
+        # arXiv does not know the id
+        self.records: Dict[str, Optional[ArxivRecord]] = {}
         
     def extract_year_from_id(self, paper_id: str) -> Optional[int]:
         """Extract year from paper ID (e.g., 'smith2024gaussian' -> 2024)."""
@@ -63,11 +126,18 @@ class YAMLUpdater:
             arxiv_id = self.extract_arxiv_id(paper_url)
             if arxiv_id:
                 # Try to get date from arXiv
-                search = arxiv.Search(id_list=[arxiv_id])
-                results = list(self.client.results(search))
-                
-                if results:
-                    entry['publication_date'] = results[0].published.isoformat()
+                record = self.records.get(arxiv_id)
+                if record is None and arxiv_id not in self.records:
+                    record = self.resolver.get(arxiv_id)
+                error = self.resolver.errors.get(arxiv_id)
+                if error:
+                    # The lookup failed, not the paper: an estimated date written now
+                    # would never be corrected, so leave it for the next run
+                    self.failed_papers.append((paper_id, f"arXiv lookup failed: {error}"))
+                    return entry, False
+
+                if record:
+                    entry['publication_date'] = record.published.isoformat()
                     entry['date_source'] = 'arxiv'
                     print(f"Updated {paper_id} with arXiv date {entry['publication_date']}")
                     return entry, True
@@ -87,6 +157,25 @@ class YAMLUpdater:
             self.failed_papers.append((paper_id, str(e)))
             return entry, False
 
+    def prefetch(self, entries: List[Dict[str, Any]]) -> None:
+        """Resolve the arXiv ids of ``entries`` in batches for process_paper to use."""
+        arxiv_ids = [self.extract_arxiv_id(entry.get('paper', '')) for entry in entries]
+        arxiv_ids = [i for i in arxiv_ids if i]
+        if not arxiv_ids:
+            return
+        requests_before = self.resolver.requests
+        found = self.resolver.resolve(arxiv_ids)
+        print(f"Fetched {len(found)} of {len(arxiv_ids)} arXiv records in "
+              f"{self.resolver.requests - requests_before} requests")
+        if self.resolver.errors:
+            print(f"arXiv lookups failed for {len(self.resolver.errors)} ids; "
+                  f"their entries are left for the next run")
+        # Ids arXiv did not return are recorded as None so process_paper does not ask
+        # again. Ids whose lookup failed are recorded too: process_paper finds them in
+        # the resolver's errors and fails their entries rather than asking once per entry.
+        for arxiv_id in arxiv_ids:
+            self.records[arxiv_id] = found.get(arxiv_id)
+
     def safe_sort_key(self, x: Dict[str, Any]) -> tuple:
         """Safe sort key that handles None values."""
         pub_date = x.get('publication_date', '9999')
@@ -109,40 +198,125 @@ class YAMLUpdater:
         
         return (pub_date, source_priority[date_source], last_name, title)
 
-    def update_yaml_with_dates(self, filename: str = "awesome_3dgs_papers.yaml"):
-        """Update YAML file with publication dates."""
+    def backfill_from_snapshot(self, data: List[Dict[str, Any]], snapshot: str) -> int:
+        """Fill dates and abstracts from a local arXiv metadata snapshot instead of the API.
+
+        Entries without a date, with an estimated date or without an abstract are looked
+        up in one pass over the snapshot. Papers it does not hold get estimated dates
+        from process_paper without asking the API. Returns the number of entries changed
+        here.
+        """
+        def missing_abstract(entry):
+            abstract = entry.get('abstract')
+            return not abstract or str(abstract).strip().lower() == 'none'
+
+        # Several entries can name one paper (duplicates, or URLs with and without a version)
+        wanted: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in data:
+            if entry.get('date_source') != 'arxiv' or missing_abstract(entry):
+                arxiv_id = self.extract_arxiv_id(entry.get('paper', ''))
+                if arxiv_id:
+                    wanted.setdefault(arxiv_id, []).append(entry)
+        print(f"Looking up {len(wanted)} papers in {snapshot}")
+        found = read_snapshot(snapshot, wanted)
+
+        changed = 0
+        for arxiv_id, entries in wanted.items():
+            record = self.records[arxiv_id] = found.get(arxiv_id)
+            if record is None:
+                continue
+            for entry in entries:
+                updated = False
+                if entry.get('date_source') == 'estimated':
+                    # An estimated date is upgraded to the real one
+                    entry['publication_date'] = record.published.isoformat()
+                    entry['date_source'] = 'arxiv'
+                    updated = True
+                if missing_abstract(entry) and record.summary:
+                    entry['abstract'] = record.summary
+                    updated = True
+                changed += updated
+        print(f"Found {len(found)} of {len(wanted)} papers in the snapshot, "
+              f"updated {changed} entries")
+        return changed
+
+    def save_yaml(self, data: List[Dict[str, Any]], filename: str) -> None:
+        """Sort and write ``data``; a replaced file is never left half-written."""
+        try:
+            data.sort(key=self.safe_sort_key, reverse=True)  # Newest first
+        except Exception as e:
+            print(f"Error during sorting: {str(e)}")
+
+        with atomic_write(filename) as file:
+            yaml.dump(data, file, sort_keys=False, allow_unicode=True)
+
+    def update_yaml_with_dates(self, filename: str = "awesome_3dgs_papers.yaml",
+                               snapshot: Optional[str] = None, resume: bool = False,
+                               journal_path: str = ".cache/fix_date_journal.jsonl",
+                               flush_every: int = 200):
+        """Update YAML file with publication dates.
+
+        With ``snapshot``, the path to a local arXiv metadata snapshot, dates and missing
+        abstracts come from it and the arXiv API is not used.
+
+        Each entry that gets a date is recorded in the journal at ``journal_path`` and
+        the YAML is rewritten every ``flush_every`` entries. With ``resume`` the journal
+        of an interrupted run is replayed and its entries are not processed again; the
+        journal is deleted once the run completes.
+        """
         # Load existing YAML
-        with open(filename, 'r', encoding='utf-8') as file:
-            data = yaml.safe_load(file)
+        data = load_papers(filename)
+
+        journal = CheckpointJournal(journal_path)
+        finished = set()
+        if resume and journal.exists():
+            finished = journal.replay(data)
+            print(f"Resuming: {len(finished)} entries already done in {journal_path}")
+        elif journal.exists():
+            print(f"Discarding the journal of an earlier run ({journal_path}); "
+                  f"use --resume to continue it")
+            journal.remove()
+
+        changed = self.backfill_from_snapshot(data, snapshot) if snapshot else 0
+        changed += len(finished)
 
         # Count papers needing updates
-        papers_to_update = [p for p in data if 'publication_date' not in p]
-        if not papers_to_update:
+        papers_to_update = [p for p in data
+                            if 'publication_date' not in p and p.get('id') not in finished]
+        if not papers_to_update and not changed:
             print("No papers need date updates.")
+            journal.remove()
             return data
 
         print(f"Found {len(papers_to_update)} papers needing date updates")
 
-        # Process papers in parallel
+        # Fetch the arXiv records of all of them in a few batched requests; a snapshot
+        # run already has them
+        if not snapshot:
+            self.prefetch(papers_to_update)
+
         updated_count = {'arxiv': 0, 'estimated': 0}
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_paper = {executor.submit(self.process_paper, entry): entry 
-                             for entry in papers_to_update}
-            
-            for future in as_completed(future_to_paper):
-                entry, success = future.result()
+        try:
+            for done, entry in enumerate(papers_to_update, 1):
+                entry, success = self.process_paper(entry)
+                if success:
+                    journal.record(entry)
                 if success and 'date_source' in entry:
                     updated_count[entry['date_source']] += 1
-
-        # Sort entries
-        try:
-            data.sort(key=self.safe_sort_key, reverse=True)  # Newest first
-        except Exception as e:
-            print(f"Error during sorting: {str(e)}")
+                if done % flush_every == 0:
+                    journal.sync()
+                    self.save_yaml(data, filename)
+                    print(f"Saved {done} of {len(papers_to_update)} entries to {filename}")
+        except KeyboardInterrupt:
+            journal.sync()
+            self.save_yaml(data, filename)
+            print(f"\nInterrupted; progress saved to {filename}. "
+                  f"Run again with --resume to continue.")
+            raise
 
         # Save updated YAML
-        with open(filename, 'w', encoding='utf-8') as file:
-            yaml.dump(data, file, sort_keys=False, allow_unicode=True)
+        self.save_yaml(data, filename)
+        journal.remove()
 
         # Print summary
         print("\nUpdate Summary:")
@@ -158,5 +332,20 @@ class YAMLUpdater:
         return data
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Add publication dates to the paper list')
+    parser.add_argument('filename', nargs='?', default='awesome_3dgs_papers.yaml',
+                        help='Path to the YAML paper list')
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help='Read dates and missing abstracts from a local copy of the arXiv '
+                             'metadata snapshot (JSON lines) instead of the arXiv API')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run from its checkpoint journal')
+    parser.add_argument('--journal', default='.cache/fix_date_journal.jsonl',
+                        help='Checkpoint journal recording each finished entry')
+    parser.add_argument('--flush-every', type=int, default=200,
+                        help='Rewrite the YAML after this many processed entries')
+    args = parser.parse_args()
+
     updater = YAMLUpdater()
-    updater.update_yaml_with_dates()
+    updater.update_yaml_with_dates(args.filename, snapshot=args.snapshot, resume=args.resume,
+                                   journal_path=args.journal, flush_every=args.flush_every)
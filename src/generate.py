@@ -1,69 +1,201 @@
-import yaml
+import argparse
+import itertools
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Any
-from helper import (SITE_TITLE, SITE_URL, generate_paper_cards, generate_sitemap,
-                    generate_structured_data, generate_tag_filters, generate_year_options,
-                    site_description)
-from utils import read_files, write_output
+from typing import Dict, Any, Iterable, Iterator, Optional
+from helper import (SITE_TITLE, SITE_URL, EntrySummary, card_generator, generate_sitemap,
+                    generate_structured_data, papers_from_entries, site_description)
+from paper_generator import sort_papers
+from abstract_shards import SHARD_MODES, AbstractShards, has_abstract
+from assets import PageAssets
+from page_weight import Meter, PageWeight, precompress
+from paper_schema import Paper
+from facets import FacetIndex
+from payload import PaperPayload
+from search_index import SearchIndex
+from utils import open_output, script_json, write_output
 from template_engine import TemplateEngine
+from yaml_loader import iter_papers
 
-def generate_html(entries: List[Dict[str, Any]], output_file: str) -> None:
-    """Generate optimized HTML page while preserving design."""
+def generate_html(entries: Iterable[Dict[str, Any]], output_file: str, jobs: int = 1,
+                  virtualize: bool = False, abstract_shards: Optional[str] = None,
+                  external_assets: bool = False, compress: bool = False) -> PageWeight:
+    """Generate optimized HTML page while preserving design.
+
+    With ``virtualize`` the papers are shipped as a JSON payload instead of rendered cards,
+    and the page renders only the cards near the viewport. With ``abstract_shards`` ('year'
+    or 'hash') abstracts go to JSON files in an abstracts/ directory next to the page and
+    are fetched when first opened. With ``external_assets`` the CSS and JS are written to
+    content-hashed bundles in a static/ directory next to the page instead of inlined.
+    With ``compress`` every file written also gets .gz (and .br) siblings.
+
+    Returns the size of each section of the page, raw and compressed.
+    """
     # Get base directory
     base_dir = Path(__file__).parent
 
     # Read CSS and JS files
     css_files = ['static/css/base.css', 'static/css/components.css', 'static/css/responsive.css']
+    # The filtering engine runs on the page and, started from the same source, in a Web Worker.
+    engine_files = ['static/js/bitset.js', 'static/js/search.js', 'static/js/engine.js']
+    worker_files = ['static/js/filter-worker.js']
     js_files = ['static/js/state.js', 'static/js/utils.js', 'static/js/filters.js', 'static/js/selection.js',
-                'static/js/sharing.js', 'static/js/navigation.js', 'static/js/main.js']
+                'static/js/sharing.js', 'static/js/navigation.js', 'static/js/cards.js',
+                'static/js/virtual.js', 'static/js/abstracts.js', 'static/js/main.js']
 
-    css_content = read_files(base_dir, css_files)
-    js_content = read_files(base_dir, js_files)
+    assets = PageAssets(base_dir, Path(output_file).parent if external_assets else None)
 
     # Initialize template engine
     template = TemplateEngine(base_dir / 'templates/index.html')
 
     last_modified = datetime.now(timezone.utc).strftime('%Y-%m-%d')
-    description = site_description(len(entries))
+
+    # Papers are streamed straight into the page. Drawing the first one makes the sort
+    # read every entry, which also completes the counts, years and tags the head needs.
+    summary = EntrySummary()
+    papers = sort_papers(papers_from_entries(summary.tap(entries)))
+    first_paper = next(papers, None)
+    if first_paper is not None:
+        papers = itertools.chain([first_paper], papers)
+    search_index = SearchIndex()
+    facet_index = FacetIndex()
+    papers = facet_index.tap(search_index.tap(papers))
+    shards = None
+    if abstract_shards:
+        shards = AbstractShards(Path(output_file).parent, abstract_shards)
+        papers = shards.tap(papers)
+    description = site_description(summary.count)
+
+    weight = PageWeight()
+    papers_meter = weight.meter('paper data' if virtualize else 'cards')
+    if not shards:
+        abstracts_meter = weight.meter('  of which abstracts')
+        papers = _measure_abstracts(papers, abstracts_meter)
 
     # Prepare template context
     context = {
-        'styles': '\n'.join(css_content),
-        'scripts': '\n'.join(js_content),
+        'styles': assets.styles(css_files),
+        'scripts': assets.scripts(engine_files, worker_files, js_files),
         'site_title': SITE_TITLE,
         'site_url': SITE_URL,
         'description': description,
-        'paper_count': len(entries),
-        'structured_data': generate_structured_data(entries, last_modified),
-        'year_options': generate_year_options(entries),
-        'tag_filters': generate_tag_filters(entries),
-        'paper_cards': generate_paper_cards(entries)
+        'paper_count': summary.count,
+        'structured_data': generate_structured_data(summary.count, last_modified),
+        'year_options': summary.year_options(),
+        'tag_filters': summary.tag_filters(),
+        'paper_cards': '',
+        'paper_data': '',
+        'search_index': '',
+        'facet_index': '',
+        'abstract_shards': '',
     }
+    if virtualize:
+        slot, items = 'paper_data', PaperPayload(abstract_shards).iter_script(papers)
+    else:
+        slot = 'paper_cards'
+        items = card_generator.iter_cards(papers, jobs=jobs, abstract_shards=abstract_shards)
+    items = papers_meter.tap(items)
 
-    # Generate final HTML
-    html = template.render(context)
-    write_output(output_file, html)
+    def items_then_indexes():
+        yield from items
+        # The tail is rendered after the last paper, so what was gathered while the papers
+        # streamed past can still go into it.
+        context['search_index'] = search_index.script()
+        context['facet_index'] = facet_index.script()
+        if shards:
+            context['abstract_shards'] = (f'<script type="application/json" id="abstract-shards">'
+                                          f'{script_json(shards.write())}</script>')
+
+    # Write head, papers and tail as they are produced; an output name ending in .gz is
+    # written through a gzip stream.
+    with open_output(output_file) as out:
+        template.render_to(out, context, slot, items_then_indexes())
+    if shards:
+        shards.prune()
+    assets.prune()
 
     # A sitemap sits next to the page so it can be submitted to Search Console.
     # No robots.txt: on a project Pages site only mrnerf.github.io/robots.txt is honoured.
     sitemap_path = Path(output_file).parent / 'sitemap.xml'
     write_output(str(sitemap_path), generate_sitemap(last_modified))
 
+    for name, label in (('search_index', 'search index'), ('facet_index', 'facet index'),
+                        ('styles', 'CSS'), ('scripts', 'JavaScript'),
+                        ('structured_data', 'structured data')):
+        weight.add_text(label, context[name])
+    weight.measure_page(output_file)
+    output_dir = Path(output_file).parent
+    extra_files = [output_dir / url for url in shards.files.values()] if shards else []
+    extra_files += [assets.directory / name for name in sorted(assets.written)]
+    for path in extra_files:
+        label = 'abstract shards' if path.parent.name == 'abstracts' else f"static/{path.name}"
+        weight.add_file(label, path)
+
+    if compress:
+        outputs = [sitemap_path] + extra_files
+        if not output_file.endswith('.gz'):
+            outputs.append(Path(output_file))
+        for path in outputs:
+            precompress(path)
+    return weight
+
+def _measure_abstracts(papers: Iterable[Paper], meter: Meter) -> Iterator[Paper]:
+    for paper in papers:
+        if has_abstract(paper):
+            meter.add(paper.abstract)
+        yield paper
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the paper list page from the YAML database.")
+    parser.add_argument('input_yaml')
+    parser.add_argument('output_html', help="Output page; a name ending in .gz is written gzip-compressed")
+    parser.add_argument('--cache-dir', type=Path, default=None,
+                        help="Reuse rendered cards from this directory and re-render only new or "
+                             "changed papers (e.g. .cache/cards)")
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help="Render cards in N worker processes; the output is identical to a serial build")
+    parser.add_argument('--virtualize', action='store_true',
+                        help="Ship the papers as a JSON payload and render only the cards near the viewport")
+    parser.add_argument('--abstract-shards', choices=SHARD_MODES, default=None,
+                        help="Move abstracts out of the page into JSON files split by year or by a "
+                             "hash of the paper id; the page fetches a shard when one of its "
+                             "abstracts is first opened")
+    parser.add_argument('--external-assets', action='store_true',
+                        help="Write CSS and JS to minified, content-hashed files under static/ next "
+                             "to the page instead of inlining them, so browsers can keep them cached")
+    parser.add_argument('--compress', action='store_true',
+                        help="Also write .gz (and .br, if the brotli module is installed) copies of "
+                             "the page, sitemap and JSON and asset files at maximum compression")
+    parser.add_argument('--budget-kb', type=float, default=None, metavar='KB',
+                        help="Fail the build when the gzip-compressed page exceeds KB kilobytes")
+    return parser.parse_args()
+
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python generate.py <input_yaml> <output_html>")
-        sys.exit(1)
+    args = parse_args()
 
     try:
         # Load YAML data
-        with open(sys.argv[1], 'r', encoding='utf-8') as f:
-            entries = yaml.safe_load(f)
+        entries = iter_papers(args.input_yaml)
+
+        cache = card_generator.enable_cache(args.cache_dir) if args.cache_dir else None
 
         # Generate website
-        generate_html(entries, sys.argv[2])
-        print(f"Successfully generated {sys.argv[2]}")
+        weight = generate_html(entries, args.output_html, jobs=args.jobs, virtualize=args.virtualize,
+                               abstract_shards=args.abstract_shards,
+                               external_assets=args.external_assets, compress=args.compress)
+        print(f"Successfully generated {args.output_html}")
+        print(weight.report())
+
+        # A build that rendered no cards (--virtualize) must not empty the cache
+        if cache and (cache.hits or cache.misses):
+            pruned = cache.prune()
+            print(f"Card cache: {cache.hits} reused, {cache.misses} rendered, {pruned} stale removed")
+
+        if args.budget_kb is not None and weight.over_budget(args.budget_kb):
+            print(f"Error: the compressed page is {weight.page[1] / 1024:.1f} KB, "
+                  f"over the {args.budget_kb:g} KB budget")
+            sys.exit(1)
 
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -1,6 +1,6 @@
 import json
 from html import escape
-from typing import List, Dict, Any
+from typing import Dict, Any, Iterable, Iterator, Set
 from paper_schema import Paper
 from pathlib import Path
 from paper_generator import PaperCardGenerator
@@ -19,23 +19,41 @@ def site_description(count: int) -> str:
     return (f"Searchable database of {count} 3D Gaussian Splatting papers — SLAM, dynamic and 4D "
             f"scenes, compression, avatars, relighting and real-time rendering. Filter by year and tag.")
 
-def generate_year_options(entries: List[Dict[str, Any]]) -> str:
-    """Generate HTML for year filter options."""
-    years = sorted({str(e.get("year", "")) for e in entries if e.get("year")}, reverse=True)
-    return "\n".join(f'<option value="{y}">{y}</option>' for y in years)
+class EntrySummary:
+    """Count, years and tags of the database, gathered while its entries stream past.
 
-def generate_tag_filters(entries: List[Dict[str, Any]]) -> str:
-    """Generate HTML for tag filters as real buttons so they are keyboard reachable."""
-    all_tags = sorted(set(tag for entry in entries for tag in entry["tags"]))
-    filtered_tags = [t for t in all_tags if not t.startswith("Year ")]
-    return "\n".join(
-        f'<button type="button" class="tag-filter" data-tag="{escape(t, quote=True)}" '
-        f'aria-pressed="false" aria-label="{escape(t, quote=True)}: not filtered">'
-        f'<span class="tag-filter-state" aria-hidden="true"></span>{escape(t)}</button>'
-        for t in filtered_tags
-    )
+    Lets the page header be filled in from the same single pass that renders the cards,
+    instead of keeping every entry around for a second look.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.years: Set[str] = set()
+        self.tags: Set[str] = set()
+
+    def tap(self, entries: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for entry in entries:
+            self.count += 1
+            if entry.get("year"):
+                self.years.add(str(entry["year"]))
+            self.tags.update(entry["tags"])
+            yield entry
 
-def generate_structured_data(entries: List[Dict[str, Any]], last_modified: str) -> str:
+    def year_options(self) -> str:
+        return "\n".join(f'<option value="{y}">{y}</option>' for y in sorted(self.years, reverse=True))
+
+    def tag_filters(self) -> str:
+        """Tag filters as real buttons so they are keyboard reachable."""
+        filtered_tags = [t for t in sorted(self.tags) if not t.startswith("Year ")]
+        return "\n".join(
+            f'<button type="button" class="tag-filter" data-tag="{escape(t, quote=True)}" '
+            f'aria-pressed="false" aria-label="{escape(t, quote=True)}: not filtered">'
+            f'<span class="tag-filter-state" aria-hidden="true"></span>{escape(t)}'
+            f'<span class="tag-filter-count"></span></button>'
+            for t in filtered_tags
+        )
+
+def generate_structured_data(count: int, last_modified: str) -> str:
     """Schema.org description of the page and of the paper collection behind it.
 
     The list is described by size rather than enumerated: emitting 500+ ScholarlyArticle
@@ -43,7 +61,6 @@ def generate_structured_data(entries: List[Dict[str, Any]], last_modified: str)
     in web search. The Dataset node is what makes the collection eligible for Google
     Dataset Search.
     """
-    count = len(entries)
     graph = [
         {
             "@type": "CollectionPage",
@@ -103,26 +120,12 @@ def generate_sitemap(last_modified: str) -> str:
         '</urlset>\n'
     )
 
-def generate_paper_cards(entries: List[Dict[str, Any]]) -> str:
-    """Generate HTML for paper cards using the Paper model and card generator."""
-    # Convert dictionary entries to Paper objects with validation
-    papers = []
+def papers_from_entries(entries: Iterable[Dict[str, Any]]) -> Iterator[Paper]:
+    """Convert dictionary entries to Paper objects, skipping invalid ones with a warning."""
     for entry in entries:
         try:
-            paper = Paper.from_dict(entry)
-            papers.append(paper)
+            yield Paper.from_dict(entry)
         except ValueError as e:
             paper_id = entry.get('id', 'Unknown ID')
             title = entry.get('title', 'Unknown Title')
             print(f"Warning: Invalid paper entry '{paper_id}' ({title}): {e}")
-            continue
-
-    # Sort papers by publication date (newest first), then author, then title
-    papers.sort(key=lambda p: (
-        p.publication_date or '9999',  # Use '9999' for papers without dates
-        p.authors.split(',')[0].strip().split()[-1].lower(),  # First author's last name
-        p.title.lower()
-    ), reverse=True)
-
-    # Generate HTML using the card generator
-    return card_generator.generate_cards(papers)
@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+from url_status import DEFAULT_PATH
+
+# Recent request latencies kept per host, in seconds.
+LATENCY_SAMPLES = 32
+
+# A host's answer to HEAD is tried again after this long.
+HEAD_MAX_AGE = 30 * 24 * 3600
+
+# HEADs in a row that must disagree with the GET before a host gets GETs only; one URL
+# that answers HEAD oddly says little about the rest of the host.
+HEAD_MISSES = 3
+
+# 403 and 429 are overwhelmingly bot protection rather than a rotten link, so
+# they are listed separately instead of being reported as broken.
+BLOCKED_CODES = {401, 403, 429}
+
+# A host that answered with a bot-protection code is treated as blocking us for this long.
+BLOCKED_MAX_AGE = 14 * 24 * 3600
+
+@dataclass
+class HostProfile:
+    """What probing one host has taught us: HEAD support, latency, bot protection."""
+    host: str
+    head_ok: Optional[bool] = None  # None until a HEAD has been answered either way
+    head_misses: int = 0            # HEADs in a row that disagreed with the GET
+    head_checked_at: float = 0.0
+    blocked_at: float = 0.0         # last bot-protection response
+    latencies: List[float] = field(default_factory=list)
+
+    def use_head(self) -> bool:
+        """Whether a probe should start with HEAD or go straight to a streamed GET."""
+        return self.head_ok is not False or time.time() - self.head_checked_at > HEAD_MAX_AGE
+
+    def blocking(self) -> bool:
+        """Whether the host answered with bot protection recently."""
+        return time.time() - self.blocked_at < BLOCKED_MAX_AGE
+
+class HostProfiles:
+    """Per-host profiles, kept in the URL status database between runs."""
+
+    def __init__(self, path: Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(hosts)")]
+        if columns and 'blocked_at' not in columns:
+            # Profiles from before blocking expired; they are only a cache.
+            self._db.execute("DROP TABLE hosts")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS hosts (
+            host TEXT PRIMARY KEY,
+            head_ok INTEGER,
+            head_misses INTEGER NOT NULL,
+            head_checked_at REAL NOT NULL,
+            blocked_at REAL NOT NULL,
+            latencies TEXT NOT NULL)""")
+        self._db.commit()
+        self._profiles: Dict[str, HostProfile] = {}
+        self._dirty = set()
+
+    def get(self, host: str) -> HostProfile:
+        with self._lock:
+            profile = self._profiles.get(host)
+            if profile is None:
+                row = self._db.execute(
+                    "SELECT head_ok, head_misses, head_checked_at, blocked_at, latencies "
+                    "FROM hosts WHERE host = ?", (host,)).fetchone()
+                if row is None:
+                    profile = HostProfile(host)
+                else:
+                    head_ok, head_misses, head_checked_at, blocked_at, latencies = row
+                    profile = HostProfile(host, None if head_ok is None else bool(head_ok),
+                                          head_misses, head_checked_at, blocked_at,
+                                          json.loads(latencies))
+                self._profiles[host] = profile
+            return profile
+
+    def record(self, host: str, latency: Optional[float] = None, head_ok: Optional[bool] = None,
+               blocked: bool = False) -> None:
+        """Note one request's outcome: its latency, and what it showed about HEAD or blocking."""
+        profile = self.get(host)
+        with self._lock:
+            if latency is not None:
+                profile.latencies = (profile.latencies + [round(latency, 3)])[-LATENCY_SAMPLES:]
+            if head_ok:
+                profile.head_ok = True
+                profile.head_misses = 0
+                profile.head_checked_at = time.time()
+            elif head_ok is False:
+                profile.head_misses += 1
+                if profile.head_misses >= HEAD_MISSES:
+                    profile.head_ok = False
+                    profile.head_checked_at = time.time()
+            if blocked:
+                profile.blocked_at = time.time()
+            self._dirty.add(host)
+
+    def save(self) -> None:
+        with self._lock:
+            rows = [(p.host, None if p.head_ok is None else int(p.head_ok), p.head_misses,
+                     p.head_checked_at, p.blocked_at, json.dumps(p.latencies))
+                    for p in (self._profiles[host] for host in self._dirty)]
+            self._db.executemany("INSERT OR REPLACE INTO hosts VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+            self._dirty.clear()
@@ -0,0 +1,287 @@
+"""Concurrent URL sweeps that stay polite to every host.
+
+A fixed thread pool lets a handful of slow hosts set the pace of the whole sweep, and
+retrying failures one by one afterwards adds a long serial tail. The engine here runs
+probes from an asyncio loop under a global concurrency cap, while each host gets its
+own concurrency limit and request rate, so github.com and arxiv.org are never hit by
+more than a few requests at once. Retries wait on their own host only.
+
+Two optional modes go after the tail of slow hosts. Adaptive timeouts give each host a
+timeout of a few times its observed p95 latency instead of one flat limit; a retry gets
+the full timeout, so a tight limit cannot turn a slow link into a dead one. Hedging
+fires a second request once the first has run past the host's p95, and takes whichever
+answers first. The request it leaves behind keeps its host slot until it finishes, so
+hedging never puts more requests in flight on a host than its limit.
+
+Probes are ordinary blocking functions (check_links.probe), called as
+``probe(url, timeout)`` on worker threads, with the flat timeout unless an adaptive one
+applies.
+"""
+import asyncio
+import math
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlsplit, urlunsplit
+
+GLOBAL_LIMIT = 16    # probes in flight across all hosts
+PER_HOST_LIMIT = 4   # probes in flight to one host
+HOST_RATE = 2.0      # probes started per second on one host
+HOST_BURST = 4       # probes one host may start at once after a quiet spell
+RETRIES = 1
+RETRY_DELAY = 5.0    # seconds before the first retry; doubles with each further one
+
+LATENCY_SAMPLES = 64     # recent latencies per host the engine bases its choices on
+MIN_SAMPLES = 8          # latencies needed before a host gets its own timeout or hedge delay
+TIMEOUT_FACTOR = 3.0     # adaptive timeout = this many times the host's p95 latency...
+MIN_TIMEOUT = 3.0        # ...but at least this many seconds
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def host_of(url: str) -> str:
+    return (urlsplit(url).hostname or '').lower()
+
+def canonical_url(url: str) -> str:
+    """One spelling for URLs that name the same resource.
+
+    Scheme and host are lowercased, default ports, fragments and trailing slashes
+    dropped; the path and query are kept as written.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    return urlunsplit((scheme, host, parts.path.rstrip('/'), parts.query, ''))
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, ``q`` in 0..100."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+def adaptive_timeout(samples: Sequence[float], default: float) -> float:
+    """Timeout for a host with these recent latencies, never above ``default``."""
+    if len(samples) < MIN_SAMPLES:
+        return default
+    return min(default, max(MIN_TIMEOUT, TIMEOUT_FACTOR * percentile(samples, 95)))
+
+def order_by_host(urls: Iterable[str]) -> List[str]:
+    """``urls`` grouped by host, the hosts with the most URLs first.
+
+    Probes to one host then follow each other on its kept-alive connections instead of
+    being spread over the whole sweep, and the longest per-host queues start first.
+    """
+    urls = list(urls)
+    counts = Counter(host_of(url) for url in urls)
+    return sorted(urls, key=lambda url: (-counts[host_of(url)], host_of(url)))
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average and up to ``burst`` at once."""
+
+    def __init__(self, rate: float, burst: float):
+        # Below one token the bucket could never hand one out.
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, not {burst}")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class HostLimiter:
+    """How many probes one host may have in flight, and how fast they may start."""
+
+    def __init__(self, limit: int, rate: float, burst: float, latencies: Iterable[float] = ()):
+        self.slots = asyncio.Semaphore(limit)
+        self.bucket = TokenBucket(rate, burst)
+        self.latencies = deque(latencies, maxlen=LATENCY_SAMPLES)
+
+    def p95(self) -> Optional[float]:
+        return percentile(self.latencies, 95) if len(self.latencies) >= MIN_SAMPLES else None
+
+class SweepEngine:
+    """Runs ``probe(url, timeout)`` once for every distinct URL, retrying non-final results.
+
+    ``is_final(status)`` says whether a probe result needs no retry; anything else is
+    retried up to ``retries`` times, after a per-URL backoff. ``adaptive_timeouts`` and
+    ``hedge`` turn on the modes described above; ``timeout`` is the flat timeout, and the
+    upper bound of adaptive ones; ``latencies`` seeds the per-host latency samples, e.g. from
+    host_profile.HostProfiles.
+    """
+
+    def __init__(self, probe: Callable[[str, float], Any], is_final: Callable[[Any], bool],
+                 concurrency: int = GLOBAL_LIMIT, per_host: int = PER_HOST_LIMIT,
+                 host_rate: float = HOST_RATE, host_burst: float = HOST_BURST,
+                 retries: int = RETRIES, retry_delay: float = RETRY_DELAY,
+                 adaptive_timeouts: bool = False, hedge: bool = False, timeout: float = 25.0,
+                 latencies: Optional[Dict[str, Sequence[float]]] = None):
+        self.probe = probe
+        self.is_final = is_final
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.adaptive_timeouts = adaptive_timeouts
+        self.hedge = hedge
+        self.timeout = timeout
+        self.seed_latencies = latencies or {}
+        self.probes = 0
+        self.retried = 0
+        # Tail metrics: how long each URL's first attempt took as seen by the sweep, the
+        # timeouts handed out, and what the hedges did.
+        self.durations: List[float] = []
+        self.timeouts_given: List[float] = []
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedge_saved = 0.0
+
+    def run(self, urls: Iterable[str]) -> Dict[str, Any]:
+        """Probe every URL; returns the final result of each."""
+        return asyncio.run(self.sweep(order_by_host(dict.fromkeys(urls))))
+
+    async def sweep(self, urls: Iterable[str]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        # The default executor has only a few threads on a small CI runner. Every request
+        # holds a global slot until its thread is done, abandoned ones included.
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+        self._global = asyncio.Semaphore(self.concurrency)
+        self._hosts: Dict[str, HostLimiter] = {}
+        urls = list(urls)
+        statuses = await asyncio.gather(*(self._check(url) for url in urls))
+        return dict(zip(urls, statuses))
+
+    def _host(self, url: str) -> HostLimiter:
+        host = host_of(url)
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            limiter = self._hosts[host] = HostLimiter(self.per_host, self.host_rate, self.host_burst,
+                                                      self.seed_latencies.get(host, ()))
+        return limiter
+
+    async def _request(self, host: HostLimiter, url: str, timeout: float) -> Any:
+        started = time.monotonic()
+        result = await asyncio.to_thread(self.probe, url, timeout)
+        host.latencies.append(time.monotonic() - started)
+        return result
+
+    async def _start(self, host: HostLimiter, url: str, timeout: float):
+        """Start a request once its host and the sweep have room; returns it and its start time.
+
+        The request holds its host slot and global slot until it finishes, even after a
+        hedge has answered in its place, so the threads talking to a host never outnumber
+        the host's limit. Started requests are never cancelled, since their thread would
+        run on without a slot.
+        """
+        # Wait for the host before taking a global slot, so probes queued behind a busy
+        # host never keep other hosts waiting.
+        await host.slots.acquire()
+        try:
+            await host.bucket.acquire()
+            started = time.monotonic()
+            await self._global.acquire()
+        except BaseException:
+            host.slots.release()
+            raise
+        self.probes += 1
+        request = asyncio.ensure_future(self._request(host, url, timeout))
+
+        def release(_):
+            self._global.release()
+            host.slots.release()
+        request.add_done_callback(release)
+        return request, started
+
+    async def _hedged(self, host: HostLimiter, url: str, timeout: float, first: asyncio.Future) -> Any:
+        delay = host.p95()
+        if delay is None:
+            return await first
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        # The hedge waits for a host slot and its host's rate like any other request, so
+        # on a host with a queue it rarely starts before the first request answers.
+        starting = asyncio.ensure_future(self._start(host, url, timeout))
+        done, _ = await asyncio.wait({first, starting}, return_when=asyncio.FIRST_COMPLETED)
+        if first in done:
+            starting.cancel()  # a hedge that already started runs on, unread
+            return first.result()
+        self.hedges += 1
+        second, _ = starting.result()
+        done, _ = await asyncio.wait({first, second}, return_when=asyncio.FIRST_COMPLETED)
+        if first in done:
+            return first.result()
+        self.hedge_wins += 1
+        answered = time.monotonic()
+        # Count what the hedge saved once the abandoned request finishes.
+        first.add_done_callback(lambda _: self._add_saving(time.monotonic() - answered))
+        return second.result()
+
+    def _add_saving(self, seconds: float) -> None:
+        self.hedge_saved += seconds
+
+    async def _attempt(self, url: str, first: bool = True) -> Any:
+        host = self._host(url)
+        timeout = self.timeout
+        if self.adaptive_timeouts and first:
+            timeout = adaptive_timeout(host.latencies, self.timeout)
+            self.timeouts_given.append(timeout)
+        request, started = await self._start(host, url, timeout)
+        if self.hedge and first:
+            result = await self._hedged(host, url, timeout, request)
+        else:
+            result = await request
+        if first:
+            self.durations.append(time.monotonic() - started)
+        return result
+
+    async def _check(self, url: str) -> Any:
+        status = await self._attempt(url)
+        for attempt in range(self.retries):
+            if self.is_final(status):
+                break
+            self.retried += 1
+            await asyncio.sleep(self.retry_delay * 2 ** attempt)
+            # Retries go without hedging, and with the full timeout in adaptive mode.
+            status = await self._attempt(url, first=False)
+        return status
+
+    def metrics(self) -> Dict[str, float]:
+        """Latency tail of the sweep's first attempts, and what the modes did to it."""
+        metrics = {'probes': self.probes, 'retries': self.retried}
+        if self.durations:
+            for q in (50, 95, 99):
+                metrics[f'p{q}'] = percentile(self.durations, q)
+            metrics['max'] = max(self.durations)
+        if self.timeouts_given:
+            metrics['mean_timeout'] = sum(self.timeouts_given) / len(self.timeouts_given)
+            metrics['timeouts_cut'] = sum(t < self.timeout for t in self.timeouts_given)
+        if self.hedge:
+            metrics.update(hedges=self.hedges, hedge_wins=self.hedge_wins,
+                           hedge_saved=self.hedge_saved)
+        return metrics
+
+    def summary(self) -> str:
+        m = self.metrics()
+        lines = [f"Sent {m['probes']} probes ({m['retries']} retries)"]
+        if 'p50' in m:
+            lines.append(f"First-attempt latency: p50 {m['p50']:.2f}s, p95 {m['p95']:.2f}s, "
+                         f"p99 {m['p99']:.2f}s, max {m['max']:.2f}s")
+        if 'mean_timeout' in m:
+            lines.append(f"Adaptive timeouts: {m['timeouts_cut']} of {len(self.timeouts_given)} "
+                         f"below {self.timeout:g}s, mean {m['mean_timeout']:.1f}s")
+        if self.hedge:
+            lines.append(f"Hedged {m['hedges']} requests; the hedge answered first {m['hedge_wins']} "
+                         f"times, saving at least {m['hedge_saved']:.1f}s")
+        return '\n'.join(lines)
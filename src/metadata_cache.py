@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from arxiv_metadata import ArxivRecord, split_version
+
+DEFAULT_PATH = Path('.cache/arxiv_metadata.sqlite')
+
+# How long the answer to "what is the latest version of X" is trusted. A given version
+# never changes on arXiv, so lookups of an explicit version do not expire.
+DEFAULT_TTL = 30 * 24 * 3600
+
+# Records kept; the least recently used go first.
+DEFAULT_MAX_ENTRIES = 50_000
+
+class MetadataCache:
+    """SQLite store of arXiv records, keyed by arXiv id and version.
+
+    Shared by fix_date.py and the editor through ArxivMetadataResolver, so re-running a
+    backfill or re-importing a paper does not ask arXiv about papers it already answered
+    for. One file, safe to delete at any time.
+    """
+
+    def __init__(self, path: Path = DEFAULT_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(records)")]
+        if columns and 'latest_at' not in columns:
+            # Records from before latest lookups were told apart; they are only a cache.
+            self._db.execute("DROP TABLE records")
+        # latest_at is when arXiv last gave the row as the latest version of its paper;
+        # NULL for rows only ever fetched by explicit version.
+        self._db.execute("""CREATE TABLE IF NOT EXISTS records (
+            arxiv_id TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            latest_at REAL,
+            used_at REAL NOT NULL,
+            PRIMARY KEY (arxiv_id, version))""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS records_used_at ON records (used_at)")
+        self._db.commit()
+
+    def get_many(self, arxiv_ids: Iterable[str]) -> Dict[str, ArxivRecord]:
+        """Cached records for ``arxiv_ids``, keyed by the id as asked for.
+
+        An id without a version gets the newest version arXiv gave as the latest within
+        the TTL; a version cached only because it was asked for by number does not count.
+        """
+        now = time.time()
+        found: Dict[str, ArxivRecord] = {}
+        with self._lock:
+            for requested in arxiv_ids:
+                base, version = split_version(requested)
+                if version is None:
+                    row = self._db.execute(
+                        "SELECT version, data FROM records WHERE arxiv_id = ? AND latest_at >= ? "
+                        "ORDER BY version DESC LIMIT 1", (base, now - self.ttl)).fetchone()
+                else:
+                    row = self._db.execute(
+                        "SELECT version, data FROM records WHERE arxiv_id = ? AND version = ?",
+                        (base, version)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    continue
+                self.hits += 1
+                found[requested] = ArxivRecord.from_dict(json.loads(row[1]))
+                self._db.execute("UPDATE records SET used_at = ? WHERE arxiv_id = ? AND version = ?",
+                                 (now, base, row[0]))
+            self._db.commit()
+        return found
+
+    def get(self, arxiv_id: str) -> Optional[ArxivRecord]:
+        return self.get_many([arxiv_id]).get(arxiv_id)
+
+    def put_many(self, records: Iterable[ArxivRecord], latest: bool = False) -> None:
+        """Store ``records``; ``latest`` when arXiv gave them for ids without a version."""
+        now = time.time()
+        rows = [(r.arxiv_id, r.version, json.dumps(r.to_dict(), ensure_ascii=False), now,
+                 now if latest else None, now)
+                for r in records]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO records VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (arxiv_id, version) DO UPDATE SET data = excluded.data, "
+                "fetched_at = excluded.fetched_at, used_at = excluded.used_at, "
+                "latest_at = COALESCE(excluded.latest_at, latest_at)", rows)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        count = self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM records WHERE rowid IN "
+                "(SELECT rowid FROM records ORDER BY used_at LIMIT ?)", (count - self.max_entries,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -1,10 +1,17 @@
 from pathlib import Path
+import heapq
 import json
+import pickle
 import re
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from html import escape
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 from paper_schema import Paper
 from template_engine import TemplateEngine
+from card_cache import CardCache
+from abstract_shards import has_abstract, shard_key
 
 _TAG_RE = re.compile(r'<[^>]+>')
 
@@ -17,11 +24,71 @@ def _attr(value: str) -> str:
     """
     return escape(_TAG_RE.sub('', value or ''), quote=True)
 
+# Papers held in memory at once by sort_papers; larger inputs are spilled to disk in runs.
+RUN_SIZE = 2000
+
+# Papers per task handed to a render worker. Large enough that pickling overhead stays
+# small next to rendering, small enough that every worker gets several tasks.
+CHUNK_SIZE = 256
+
+def paper_sort_key(paper: Paper) -> tuple:
+    """Publication date, then first author's last name, then title; sorted in reverse (newest first)."""
+    return (paper.publication_date or '9999',  # Use '9999' for papers without dates
+            paper.authors.split(',')[0].strip().split()[-1].lower(),
+            paper.title.lower())
+
+def _spill(papers: List[Paper], directory: str, index: int) -> Path:
+    path = Path(directory) / f"run-{index:05d}.pickle"
+    with open(path, 'wb') as f:
+        for paper in papers:
+            pickle.dump(paper, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+def _read_run(path: Path) -> Iterator[Paper]:
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+def sort_papers(papers: Iterable[Paper], run_size: int = RUN_SIZE) -> Iterator[Paper]:
+    """Yield papers newest first while holding at most ``run_size`` of them in memory.
+
+    The input is cut into sorted runs, all but the last spilled to temporary files, and the
+    runs are merged lazily. Both list.sort and heapq.merge are stable, so the result is the
+    same order a single in-memory sort would give.
+    """
+    with tempfile.TemporaryDirectory(prefix='paper-runs-') as tmp:
+        runs = []
+        batch: List[Paper] = []
+        for paper in papers:
+            batch.append(paper)
+            if len(batch) >= run_size:
+                batch.sort(key=paper_sort_key, reverse=True)
+                runs.append(_spill(batch, tmp, len(runs)))
+                batch = []
+        batch.sort(key=paper_sort_key, reverse=True)
+        if not runs:
+            yield from batch
+            return
+        yield from heapq.merge(*(_read_run(run) for run in runs), batch,
+                               key=paper_sort_key, reverse=True)
+
 class PaperCardGenerator:
     """Generates HTML for paper cards using templates."""
     
     def __init__(self, templates_dir: Path):
-        self.template = TemplateEngine(templates_dir / 'paper_card.html')
+        self.template_path = templates_dir / 'paper_card.html'
+        self.template = TemplateEngine(self.template_path)
+        self.cache: Optional[CardCache] = None
+
+    def enable_cache(self, cache_dir: Path) -> CardCache:
+        """Reuse cards rendered by earlier builds; only new or edited papers are rendered."""
+        # abstract_shards.py decides which shard a card's abstract is fetched from
+        self.cache = CardCache(cache_dir, self.template_path, Path(__file__),
+                               Path(__file__).with_name('abstract_shards.py'))
+        return self.cache
 
     def _generate_link(self, url: str, icon: str, text: str, emoji: str = "") -> str:
         """Generate HTML for a paper link with icon and emoji."""
@@ -30,8 +97,12 @@ class PaperCardGenerator:
         return (f'<a href="{url}" class="paper-link" target="_blank" rel="noopener">'
                 f'{emoji} {text}</a>')
 
-    def _generate_links(self, paper: Paper) -> str:
-        """Generate HTML for all paper links in specified order."""
+    def _generate_links(self, paper: Paper, abstract_shards: Optional[str] = None) -> str:
+        """Generate HTML for all paper links in specified order.
+
+        With a shard mode ('year' or 'hash') the abstract is left out and the card names
+        the shard file the page fetches it from (see abstract_shards.AbstractShards).
+        """
         links = []
         
         # Paper link is always first if available and valid
@@ -48,7 +119,15 @@ class PaperCardGenerator:
         
         # Abstract is always last if present. <details> gives the disclosure behaviour
         # natively, so it works without JavaScript and is keyboard operable.
-        if paper.abstract and paper.abstract.lower() != 'none':
+        if has_abstract(paper) and abstract_shards:
+            shard = shard_key(paper, abstract_shards)
+            links.append(
+                f'<details class="paper-abstract-wrap" data-shard="{shard}">'
+                '<summary class="abstract-toggle">📖 Abstract</summary>'
+                '<div class="paper-abstract"></div>'
+                '</details>'
+            )
+        elif has_abstract(paper):
             links.append(
                 '<details class="paper-abstract-wrap">'
                 '<summary class="abstract-toggle">📖 Abstract</summary>'
@@ -63,9 +142,9 @@ class PaperCardGenerator:
         display_tags = [t for t in paper.tags if not t.startswith("Year ")]
         return "\n".join(f'<span class="paper-tag">{t}</span>' for t in display_tags)
 
-    def generate_card(self, paper: Paper) -> str:
-        """Generate HTML for a paper card using the template."""
-        context = {
+    def card_context(self, paper: Paper, abstract_shards: Optional[str] = None) -> dict:
+        """Values for the placeholders of paper_card.html."""
+        return {
             'id': paper.id,
             'title': paper.title,
             'title_attr': _attr(paper.title),
@@ -75,19 +154,91 @@ class PaperCardGenerator:
             'tags_json': json.dumps(paper.tags),
             'thumbnail': paper.thumbnail or f"assets/thumbnails/{paper.id}.jpg",
             'tags_html': self._generate_tags(paper),
-            'links_html': self._generate_links(paper),
+            'links_html': self._generate_links(paper, abstract_shards),
             'abstract_html': paper.abstract or ""
         }
-    
-        return self.template.render(context)
-
-    def generate_cards(self, papers: List[Paper]) -> str:
-        """Generate HTML for all paper cards."""
-        # Sort papers by publication date (newest first), then author, then title
-        sorted_papers = sorted(papers, 
-            key=lambda p: (p.publication_date or '9999',
-                         p.authors.split(',')[0].strip().split()[-1].lower(),
-                         p.title.lower()),
-            reverse=True
-        )
-        return "\n".join(self.generate_card(paper) for paper in sorted_papers)
\ No newline at end of file
+
+    def generate_card(self, paper: Paper, abstract_shards: Optional[str] = None) -> str:
+        """Generate HTML for a paper card using the template."""
+        return self.template.render(self.card_context(paper, abstract_shards))
+
+    def _cached_card(self, paper: Paper, abstract_shards: Optional[str]) -> str:
+        """Card HTML from the cache when one is enabled and holds it, freshly rendered otherwise."""
+        if self.cache is None:
+            return self.generate_card(paper, abstract_shards)
+        key = self.cache.key(paper, abstract_shards or '')
+        html = self.cache.get(key)
+        if html is None:
+            html = self.generate_card(paper, abstract_shards)
+            self.cache.put(key, html)
+        return html
+
+    def iter_cards(self, papers: Iterable[Paper], jobs: int = 1,
+                   abstract_shards: Optional[str] = None) -> Iterator[str]:
+        """Yield the HTML of each card in the order the papers arrive.
+
+        ``abstract_shards`` is the shard mode of the build, if its abstracts are sharded.
+
+        With ``jobs`` > 1 the papers are cut into chunks that are rendered in a process
+        pool. Chunks are collected in submission order, so the output is byte-identical
+        to a serial run. Cache lookups and writes stay in this process; only the cards the
+        cache does not hold are sent to the workers.
+        """
+        if jobs <= 1:
+            for paper in papers:
+                yield self._cached_card(paper, abstract_shards)
+            return
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(self.template_path.parent,)) as pool:
+            # Keep a couple of chunks per worker in flight so no worker idles while the
+            # finished chunk at the head of the queue is being written out.
+            pending = deque()
+            for chunk in _chunks(papers, CHUNK_SIZE):
+                pending.append(self._submit_chunk(pool, chunk, abstract_shards))
+                if len(pending) >= 2 * jobs:
+                    yield from self._collect_chunk(*pending.popleft())
+            while pending:
+                yield from self._collect_chunk(*pending.popleft())
+
+    def _submit_chunk(self, pool: ProcessPoolExecutor, chunk: List[Paper],
+                      abstract_shards: Optional[str]):
+        cards: List[Optional[str]] = [None] * len(chunk)
+        keys: List[Optional[str]] = [None] * len(chunk)
+        if self.cache is not None:
+            for i, paper in enumerate(chunk):
+                keys[i] = self.cache.key(paper, abstract_shards or '')
+                cards[i] = self.cache.get(keys[i])
+        missing = [i for i, card in enumerate(cards) if card is None]
+        future = (pool.submit(_render_chunk, [chunk[i] for i in missing], abstract_shards)
+                  if missing else None)
+        return cards, keys, missing, future
+
+    def _collect_chunk(self, cards: List[Optional[str]], keys: List[Optional[str]],
+                       missing: List[int], future: Optional[Future]) -> Iterator[str]:
+        if future is not None:
+            for i, html in zip(missing, future.result()):
+                cards[i] = html
+                if self.cache is not None:
+                    self.cache.put(keys[i], html)
+        yield from cards
+
+def _chunks(papers: Iterable[Paper], size: int) -> Iterator[List[Paper]]:
+    chunk: List[Paper] = []
+    for paper in papers:
+        chunk.append(paper)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Render workers build their own generator once, instead of receiving it with every task.
+_worker_generator: Optional[PaperCardGenerator] = None
+
+def _init_worker(templates_dir: Path) -> None:
+    global _worker_generator
+    _worker_generator = PaperCardGenerator(templates_dir)
+
+def _render_chunk(papers: List[Paper], abstract_shards: Optional[str]) -> List[str]:
+    return [_worker_generator.generate_card(paper, abstract_shards) for paper in papers]
@@ -0,0 +1,54 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from paper_schema import Paper
+from abstract_shards import has_abstract, shard_key
+from utils import script_json
+
+# Column order of each row in the payload; static/js/cards.js reads rows by position.
+PAYLOAD_FIELDS = ('id', 'title', 'authors', 'year', 'tags', 'thumbnail',
+                  'paper', 'project_page', 'code', 'video', 'abstract')
+
+def _link(value: str) -> str:
+    """A link field as the card would show it, or '' where the card shows nothing."""
+    return '' if not value or value.lower() == 'none' else value
+
+class PaperPayload:
+    """The paper list as compact JSON for the virtualized page (generate.py --virtualize).
+
+    Each paper is one positional row instead of a rendered card, and tags are indices into
+    a shared table. Rows are produced one at a time, so the payload streams into the page
+    the same way cards do. With a shard mode the abstract column holds {"shard": key}
+    instead of the abstract, as cards of such a build do.
+    """
+
+    def __init__(self, abstract_shards: Optional[str] = None):
+        self.tag_ids: Dict[str, int] = {}
+        self.abstract_shards = abstract_shards
+
+    def row(self, paper: Paper) -> List:
+        tags = [self.tag_ids.setdefault(t, len(self.tag_ids)) for t in paper.tags]
+        default_thumbnail = f"assets/thumbnails/{paper.id}.jpg"
+        thumbnail = paper.thumbnail or default_thumbnail
+        abstract = _link(paper.abstract)
+        if self.abstract_shards and has_abstract(paper):
+            abstract = {'shard': shard_key(paper, self.abstract_shards)}
+        return [
+            paper.id,
+            paper.title,
+            paper.authors,
+            paper.year,
+            tags,
+            '' if thumbnail == default_thumbnail else thumbnail,
+            _link(paper.paper),
+            _link(paper.project_page),
+            _link(paper.code),
+            _link(paper.video),
+            abstract,
+        ]
+
+    def iter_script(self, papers: Iterable[Paper]) -> Iterator[str]:
+        """Yield a <script type="application/json" id="paper-data"> element piece by piece."""
+        yield '<script type="application/json" id="paper-data">{"rows":['
+        for i, paper in enumerate(papers):
+            yield ('' if i == 0 else ',') + script_json(self.row(paper))
+        tag_table = sorted(self.tag_ids, key=self.tag_ids.get)
+        yield f'],"tags":{script_json(tag_table)}}}</script>'
@@ -0,0 +1,67 @@
+import html
+import re
+from typing import Dict, Iterable, Iterator, List
+from paper_schema import Paper
+from utils import script_json
+
+_TAG_RE = re.compile(r'<[^>]+>')
+# Runs of letters and digits. static/js/search.js splits queries with the same rule.
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words of a title or author list, with inline markup removed."""
+    return _TOKEN_RE.findall(html.unescape(_TAG_RE.sub('', text)).lower())
+
+def _encode(postings: List[int]) -> str:
+    # Ordinals ascend, so store the gaps; base 36 keeps them to a digit or two.
+    out, last = [], 0
+    for ordinal in postings:
+        out.append(_base36(ordinal - last))
+        last = ordinal
+    return ','.join(out)
+
+def _base36(n: int) -> str:
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    s = ''
+    while True:
+        n, r = divmod(n, 36)
+        s = digits[r] + s
+        if not n:
+            return s
+
+class SearchIndex:
+    """Inverted index over paper titles and authors for the search box.
+
+    Papers are numbered in page order as they stream past, and every word maps to the
+    ascending list of papers that contain it. Words are emitted sorted, so the page finds
+    all words starting with a typed prefix with a binary search and never scans the papers
+    themselves.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.postings: Dict[str, List[int]] = {}
+
+    def add(self, paper: Paper) -> None:
+        ordinal = self.count
+        self.count += 1
+        for term in set(tokenize(paper.title) + tokenize(paper.authors)):
+            self.postings.setdefault(term, []).append(ordinal)
+
+    def tap(self, papers: Iterable[Paper]) -> Iterator[Paper]:
+        """Pass ``papers`` through unchanged, indexing each on the way."""
+        for paper in papers:
+            self.add(paper)
+            yield paper
+
+    def to_json(self) -> dict:
+        # Sort by UTF-16 code units, the order JavaScript compares strings in.
+        terms = sorted(self.postings, key=lambda t: t.encode('utf-16-be'))
+        return {
+            'count': self.count,
+            'terms': terms,
+            'postings': [_encode(self.postings[t]) for t in terms],
+        }
+
+    def script(self) -> str:
+        return f'<script type="application/json" id="search-index">{script_json(self.to_json())}</script>'
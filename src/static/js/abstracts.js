@@ -0,0 +1,50 @@
+// Abstracts of a build with `generate.py --abstract-shards` are not in the page. Their
+// <details> names a shard file, fetched the first time one of its abstracts is opened
+// and kept for the rest of the session.
+const abstractShards = {
+    files: null,
+    shards: new Map(), // shard key -> promise of { paper id: abstract }
+
+    load(key) {
+        if (!this.files) {
+            const el = document.getElementById('abstract-shards');
+            this.files = el ? JSON.parse(el.textContent) : {};
+        }
+        let shard = this.shards.get(key);
+        if (!shard) {
+            shard = fetch(this.files[key])
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    return response.json();
+                })
+                .catch(error => {
+                    // Let a later toggle try again.
+                    this.shards.delete(key);
+                    throw error;
+                });
+            this.shards.set(key, shard);
+        }
+        return shard;
+    },
+
+    fill(details) {
+        const target = details.querySelector('.paper-abstract');
+        if (target.dataset.loaded) return;
+        const paperId = details.closest('.paper-row').getAttribute('data-id');
+        target.textContent = 'Loading abstract…';
+        this.load(details.dataset.shard).then(abstracts => {
+            target.innerHTML = abstracts[paperId] || '';
+            target.dataset.loaded = 'true';
+        }).catch(() => {
+            target.textContent = 'The abstract could not be loaded.';
+        });
+    }
+};
+
+// toggle does not bubble; listen in the capture phase so rows added later are covered.
+document.addEventListener('toggle', (ev) => {
+    const details = ev.target;
+    if (details.open && details.matches && details.matches('details[data-shard]')) {
+        abstractShards.fill(details);
+    }
+}, true);
@@ -0,0 +1,136 @@
+// Packed bitsets over the papers in page order: bit i stands for window.paperIndex[i].
+function bitCount(v) {
+    v -= (v >>> 1) & 0x55555555;
+    v = (v & 0x33333333) + ((v >>> 2) & 0x33333333);
+    return (((v + (v >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+}
+
+const bitset = {
+    empty(count) {
+        return new Uint32Array((count + 31) >>> 5);
+    },
+
+    full(count) {
+        const bits = this.empty(count);
+        bits.fill(0xffffffff);
+        // Clear the bits past the last paper so popcount stays exact.
+        if (count & 31) bits[bits.length - 1] = (1 << (count & 31)) - 1;
+        return bits;
+    },
+
+    // Base64 of little-endian 32-bit words, as written by facets.FacetIndex.
+    fromBase64(text) {
+        const bytes = atob(text);
+        const bits = new Uint32Array(bytes.length >>> 2);
+        for (let w = 0, b = 0; w < bits.length; w++, b += 4) {
+            bits[w] = (bytes.charCodeAt(b) | bytes.charCodeAt(b + 1) << 8 |
+                bytes.charCodeAt(b + 2) << 16 | bytes.charCodeAt(b + 3) << 24) >>> 0;
+        }
+        return bits;
+    },
+
+    set(bits, i) {
+        bits[i >>> 5] |= 1 << (i & 31);
+    },
+
+    has(bits, i) {
+        return (bits[i >>> 5] & (1 << (i & 31))) !== 0;
+    },
+
+    // In place: target &= other.
+    and(target, other) {
+        for (let w = 0; w < target.length; w++) target[w] &= other[w];
+        return target;
+    },
+
+    // In place: target &= ~other.
+    andNot(target, other) {
+        for (let w = 0; w < target.length; w++) target[w] &= ~other[w];
+        return target;
+    },
+
+    // popcount(a & b) without materializing a & b.
+    andCount(a, b) {
+        let total = 0;
+        for (let w = 0; w < a.length; w++) total += bitCount(a[w] & b[w]);
+        return total;
+    },
+
+    popcount(bits) {
+        let total = 0;
+        for (let w = 0; w < bits.length; w++) total += bitCount(bits[w]);
+        return total;
+    }
+};
+
+// Per-tag and per-year bitsets written by facets.FacetIndex.
+const facetIndex = {
+    count: 0,
+    tags: null,
+    years: null,
+    partials: new Map(), // search + tag state -> { bits, yearCounts }
+
+    // data is the JSON written by facets.FacetIndex.
+    init(data) {
+        const decode = obj => new Map(Object.entries(obj).map(([k, v]) => [k, bitset.fromBase64(v)]));
+        this.count = data.count;
+        this.tags = decode(data.tags);
+        this.years = decode(data.years);
+        this.partials.clear();
+    },
+
+    // Papers passing the search and tag filters, whatever the year. Kept for recent
+    // states, so changing only the year starts from here instead of from scratch.
+    partial({ query, include, exclude }) {
+        const key = JSON.stringify([query, include, exclude]);
+        let entry = this.partials.get(key);
+        if (entry) return entry;
+        const none = bitset.empty(this.count);
+        const search = searchIndex.match(query);
+        const bits = search ? search.slice() : bitset.full(this.count);
+        include.forEach(t => bitset.and(bits, this.tags.get(t) || none));
+        exclude.forEach(t => {
+            const tagBits = this.tags.get(t);
+            if (tagBits) bitset.andNot(bits, tagBits);
+        });
+        if (this.partials.size >= 32) this.partials.clear();
+        entry = { bits, yearCounts: null };
+        this.partials.set(key, entry);
+        return entry;
+    },
+
+    // Papers passing the filters: query is the search box text, year is 'all' or a
+    // year, include/exclude are tag lists.
+    select(filters) {
+        const result = this.partial(filters).bits.slice();
+        if (filters.year !== 'all') {
+            bitset.and(result, this.years.get(filters.year) || bitset.empty(this.count));
+        }
+        return result;
+    },
+
+    // How many papers each choice would leave, the other filters staying as they are:
+    // per year option, and per tag if that tag were switched to include. visible is
+    // select(filters), which the caller already has.
+    counts(filters, visible) {
+        const partial = this.partial(filters);
+        if (!partial.yearCounts) {
+            partial.yearCounts = new Map([['all', bitset.popcount(partial.bits)]]);
+            this.years.forEach((bits, year) => partial.yearCounts.set(year, bitset.andCount(partial.bits, bits)));
+        }
+        const tags = new Map();
+        this.tags.forEach((bits, tag) => {
+            let base = visible;
+            if (filters.include.includes(tag) || filters.exclude.includes(tag)) {
+                // A tag's own state does not count against it.
+                base = this.select({
+                    ...filters,
+                    include: filters.include.filter(t => t !== tag),
+                    exclude: filters.exclude.filter(t => t !== tag)
+                });
+            }
+            tags.set(tag, bitset.andCount(base, bits));
+        });
+        return { years: partial.yearCounts, tags };
+    }
+};
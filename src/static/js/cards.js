@@ -0,0 +1,92 @@
+// Client-side card rendering for pages built with `generate.py --virtualize`, where the
+// papers arrive as a JSON payload instead of markup. The markup mirrors
+// templates/paper_card.html and PaperCardGenerator; keep the three in sync.
+
+function escapeHtml(text) {
+    return String(text)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;')
+        .replace(/'/g, '&#x27;');
+}
+
+// Plain text of a field that may carry inline markup (Sp<sup>2</sup>360).
+function stripTags(html) {
+    return String(html).replace(/<[^>]+>/g, '');
+}
+
+// Row layout written by payload.PaperPayload (PAYLOAD_FIELDS).
+function paperFromRow(row, tagTable) {
+    const [id, title, authors, year, tagIds, thumbnail, paper, project, code, video, abstract] = row;
+    return {
+        id,
+        title,
+        authors,
+        year: String(year),
+        tags: tagIds.map(i => tagTable[i]),
+        thumbnail: thumbnail || `assets/thumbnails/${id}.jpg`,
+        paper,
+        project,
+        code,
+        video,
+        abstract
+    };
+}
+
+function renderPaperLinks(data) {
+    const link = (url, emoji, text) =>
+        `<a href="${url}" class="paper-link" target="_blank" rel="noopener">${emoji} ${text}</a>`;
+    const links = [];
+    if (data.paper) links.push(link(data.paper, '📄', 'Paper'));
+    if (data.project) links.push(link(data.project, '🌐', 'Project'));
+    if (data.code) links.push(link(data.code, '💻', 'Code'));
+    if (data.video) links.push(link(data.video, '🎥', 'Video'));
+    if (data.abstract && data.abstract.shard) {
+        // Sharded build: abstracts.js fetches the abstract when it is opened.
+        links.push(`<details class="paper-abstract-wrap" data-shard="${escapeHtml(data.abstract.shard)}">` +
+            '<summary class="abstract-toggle">📖 Abstract</summary>' +
+            '<div class="paper-abstract"></div>' +
+            '</details>');
+    } else if (data.abstract) {
+        links.push('<details class="paper-abstract-wrap">' +
+            '<summary class="abstract-toggle">📖 Abstract</summary>' +
+            `<div class="paper-abstract">${data.abstract}</div>` +
+            '</details>');
+    }
+    return links.join('\n');
+}
+
+function renderPaperCard(data) {
+    const titleAttr = escapeHtml(stripTags(data.title));
+    const tagsHtml = data.tags
+        .filter(t => !t.startsWith('Year '))
+        .map(t => `<span class="paper-tag">${t}</span>`)
+        .join('\n');
+    return `<div class="paper-row" data-id="${escapeHtml(data.id)}" data-title="${titleAttr}" data-authors="${escapeHtml(stripTags(data.authors))}" data-year="${data.year}" data-tags='${escapeHtml(JSON.stringify(data.tags))}'>
+  <div class="paper-card">
+    <input type="checkbox" class="selection-checkbox" aria-label="Select paper: ${titleAttr}" onclick="handleCheckboxClick(event, '${escapeHtml(data.id)}', this)">
+    <div class="paper-number"></div>
+    <div class="paper-thumbnail">
+      <img src="${data.thumbnail}" alt="Paper thumbnail for ${titleAttr}" loading="lazy" decoding="async" onerror="this.style.visibility='hidden'"/>
+    </div>
+    <div class="paper-content">
+      <h2 class="paper-title">${data.title} <span class="paper-year">(${data.year})</span></h2>
+      <p class="paper-authors">${data.authors}</p>
+      <div class="paper-tags">${tagsHtml}</div>
+      <div class="paper-links">${renderPaperLinks(data)}</div>
+    </div>
+  </div>
+</div>`;
+}
+
+// Build the DOM row for an index entry, reflecting the current selection.
+function createPaperRow(paper) {
+    const template = document.createElement('template');
+    template.innerHTML = renderPaperCard(paper.data);
+    const row = template.content.firstElementChild;
+    const selected = state.selectedPapers.has(paper.id);
+    row.querySelector('.selection-checkbox').checked = selected;
+    row.querySelector('.paper-card').classList.toggle('selected', selected);
+    return row;
+}
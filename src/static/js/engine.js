@@ -0,0 +1,39 @@
+// Filtering engine shared by the page and the filtering Web Worker (filter-worker.js).
+// It holds the search and facet indexes and the current visible set, and reports each
+// run as the papers whose visibility changed, so the page only touches those rows.
+const filterEngine = {
+    visible: null,
+
+    // searchText and facetText are the JSON of the search-index and facet-index elements.
+    init(searchText, facetText, visible) {
+        searchIndex.init(JSON.parse(searchText));
+        facetIndex.init(JSON.parse(facetText));
+        this.visible = visible || bitset.full(facetIndex.count);
+    },
+
+    // filters: { query, year, include, exclude } as for facetIndex.select, plus
+    // selected, the page ordinals to show instead when showing selected papers only.
+    run(filters) {
+        let next;
+        let counts = null;
+        if (filters.selected) {
+            next = bitset.empty(facetIndex.count);
+            filters.selected.forEach(i => bitset.set(next, i));
+        } else {
+            next = facetIndex.select(filters);
+            counts = facetIndex.counts(filters, next);
+        }
+        const shown = [];
+        const hidden = [];
+        for (let w = 0; w < next.length; w++) {
+            let changed = next[w] ^ this.visible[w];
+            while (changed) {
+                const bit = 31 - Math.clz32(changed & -changed);
+                changed &= changed - 1;
+                (next[w] & (1 << bit) ? shown : hidden).push((w << 5) | bit);
+            }
+        }
+        this.visible = next;
+        return { shown, hidden, count: bitset.popcount(next), counts };
+    }
+};
@@ -0,0 +1,10 @@
+// Entry point of the filtering Web Worker. The page starts the worker from this file
+// appended to the engine scripts (bitset.js, search.js, engine.js); see filterRunner.
+self.onmessage = (ev) => {
+    const message = ev.data;
+    if (message.type === 'init') {
+        filterEngine.init(message.searchText, message.facetText);
+    } else if (message.type === 'run') {
+        self.postMessage(filterEngine.run(message.filters));
+    }
+};
@@ -6,33 +6,119 @@ function filterPapers() {
         }
     });
 
-    const papers = window.paperIndex || buildPaperIndex();
+    // Matching runs in filterRunner's worker: a few word-wide AND/ANDNOTs over the
+    // prebuilt search, tag and year bitsets. The page is updated when the result arrives.
+    filterRunner.run({
+        query: searchInput.value,
+        year: yearFilter.value,
+        include: Array.from(state.includeTags),
+        exclude: Array.from(state.excludeTags),
+        // Ordinals of the selected papers when only those are shown, so the rest are hidden
+        selected: state.onlyShowSelected
+            ? Array.from(state.selectedPapers, id => paperById(id)).filter(Boolean).map(p => p.ordinal)
+            : null
+    });
 
-    if (state.onlyShowSelected) {
-        // When showing only selected papers, hide all non-selected papers
-        papers.forEach(p => {
-            p.row.classList.toggle('hidden', !state.selectedPapers.has(p.id));
-        });
-    } else {
-        // Normal filtering
-        const sTerm = searchInput.value.toLowerCase();
-        const selYear = yearFilter.value;
-        const inc = Array.from(state.includeTags);
-        const exc = Array.from(state.excludeTags);
+    updateURL();
+}
+
+// Runs filterEngine in a Web Worker so typing never waits on matching, or on the page
+// where a worker cannot be started. Each result lists only the papers whose visibility
+// changed; results that arrive within one frame are applied together in the next.
+const filterRunner = {
+    worker: null,
+    searchText: null,
+    facetText: null,
+    lastFilters: null,
+    latest: null,
+    changed: new Set(),
+    frame: 0,
+
+    start() {
+        this.searchText = document.getElementById('search-index').textContent;
+        this.facetText = document.getElementById('facet-index').textContent;
+        try {
+            // A build with --external-assets names the worker's bundle; otherwise the
+            // worker is assembled from the inlined engine and worker scripts.
+            const entry = document.getElementById('filter-worker');
+            let url = entry.dataset.src;
+            if (!url) {
+                const source = document.getElementById('filter-engine').textContent + '\n' + entry.textContent;
+                url = URL.createObjectURL(new Blob([source], { type: 'text/javascript' }));
+            }
+            this.worker = new Worker(url);
+            this.worker.onmessage = (ev) => this.receive(ev.data);
+            this.worker.onerror = () => this.fallBack();
+            this.worker.postMessage({ type: 'init', searchText: this.searchText, facetText: this.facetText });
+        } catch (e) {
+            this.fallBack();
+        }
+    },
 
-        papers.forEach(p => {
-            const matchSearch = p.title.includes(sTerm) || p.authors.includes(sTerm);
-            const matchYear = (selYear === 'all') || (p.year === selYear);
-            const matchInc = (inc.length === 0) || inc.every(t => p.tags.includes(t));
-            const matchExc = (exc.length === 0) || !exc.some(t => p.tags.includes(t));
+    run(filters) {
+        if (!this.searchText) this.start();
+        this.lastFilters = filters;
+        if (this.worker) {
+            this.worker.postMessage({ type: 'run', filters });
+        } else {
+            this.receive(filterEngine.run(filters));
+        }
+    },
+
+    // The worker could not start or failed (a content security policy may forbid blob:
+    // workers): filter on the page from here on, starting from what the page shows now.
+    fallBack() {
+        if (this.worker) this.worker.terminate();
+        this.worker = null;
+        const shown = bitset.empty(window.paperIndex.length);
+        window.paperIndex.forEach((p, i) => {
+            if (p.visible) bitset.set(shown, i);
+        });
+        filterEngine.init(this.searchText, this.facetText, shown);
+        if (this.lastFilters) this.receive(filterEngine.run(this.lastFilters));
+    },
 
-            const visible = matchSearch && matchYear && matchInc && matchExc;
-            p.row.classList.toggle('hidden', !visible);
+    receive(result) {
+        const papers = window.paperIndex;
+        result.shown.forEach(i => {
+            papers[i].visible = true;
+            this.changed.add(i);
+        });
+        result.hidden.forEach(i => {
+            papers[i].visible = false;
+            this.changed.add(i);
         });
+        this.latest = result;
+        if (!this.frame) this.frame = requestAnimationFrame(() => this.flush());
+    },
+
+    flush() {
+        this.frame = 0;
+        applyVisibility(window.paperIndex, this.changed);
+        this.changed.clear();
+        state.visibleCount = this.latest.count;
+        // Counts are not computed while only selected papers are shown; keep the last ones.
+        if (this.latest.counts) updateFacetCounts(this.latest.counts);
+        updateFilterStatus();
     }
+};
 
-    updatePaperNumbers();
-    updateURL();
+// Show on each tag button and year option how many papers choosing it would leave.
+function updateFacetCounts(counts) {
+    tagFilters.forEach(el => {
+        const countEl = el.querySelector('.tag-filter-count');
+        if (!countEl) return;
+        const n = counts.tags.get(el.getAttribute('data-tag')) || 0;
+        if (countEl.textContent === String(n)) return;
+        countEl.textContent = n;
+        el.classList.toggle('empty', n === 0);
+        setTagState(el, tagStateOf(el));
+    });
+    Array.from(yearFilter.options).forEach(option => {
+        const label = option.value === 'all' ? 'All Years' : option.value;
+        const text = `${label} (${counts.years.get(option.value) || 0})`;
+        if (option.textContent !== text) option.textContent = text;
+    });
 }
 
 function clearSearch() {
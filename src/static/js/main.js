@@ -3,30 +3,34 @@ document.addEventListener('DOMContentLoaded', function() {
     window.searchInput = document.getElementById('searchInput');
     window.yearFilter = document.getElementById('yearFilter');
     window.tagFilters = document.querySelectorAll('.tag-filter');
-    buildPaperIndex();
+    // navigation.js may already have built the index for the initial counts
+    if (!window.paperIndex) buildPaperIndex();
+    if (state.virtual) {
+        virtualList.init(document.querySelector('.papers-grid'));
+    }
 
     // Initialize filters
     initializeFilters();
 
-    // Initialize paper card events
-    document.querySelectorAll('.paper-card').forEach(card => {
-        card.addEventListener('click', (ev) => {
-            if (!state.isSelectionMode) return;
-            // if click on link or abstract btn, ignore
-            if (
-                ev.target.classList.contains('paper-link') ||
-                ev.target.closest('.paper-link') ||
-                ev.target.classList.contains('abstract-toggle')
-            ) {
-                return;
-            }
-            const checkbox = card.querySelector('.selection-checkbox');
-            if (checkbox && ev.target !== checkbox) {
-                checkbox.checked = !checkbox.checked;
-                const pid = card.parentElement.getAttribute('data-id');
-                togglePaperSelection(pid, checkbox);
-            }
-        });
+    // Paper card events, delegated so cards rendered later by the windowed list get them too
+    document.querySelector('.papers-grid').addEventListener('click', (ev) => {
+        if (!state.isSelectionMode) return;
+        const card = ev.target.closest('.paper-card');
+        if (!card) return;
+        // if click on link or abstract btn, ignore
+        if (
+            ev.target.classList.contains('paper-link') ||
+            ev.target.closest('.paper-link') ||
+            ev.target.classList.contains('abstract-toggle')
+        ) {
+            return;
+        }
+        const checkbox = card.querySelector('.selection-checkbox');
+        if (checkbox && ev.target !== checkbox) {
+            checkbox.checked = !checkbox.checked;
+            const pid = card.parentElement.getAttribute('data-id');
+            togglePaperSelection(pid, checkbox);
+        }
     });
 
     // Apply URL parameters
@@ -34,7 +38,6 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Show initial papers
     filterPapers();
-    updatePaperNumbers();
 
     // Expose global functions for HTML onclick handlers
     window.copyBitcoinAddress = copyBitcoinAddress;
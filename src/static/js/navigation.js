@@ -23,8 +23,9 @@ function updateScrollProgress() {
 
 // Filter status functionality
 function updateFilterStatus() {
-    const visiblePapers = document.querySelectorAll('.paper-row:not(.hidden)').length;
-    const totalPapers = document.querySelectorAll('.paper-row').length;
+    const papers = window.paperIndex || buildPaperIndex();
+    const visiblePapers = state.visibleCount;
+    const totalPapers = papers.length;
     
     document.getElementById('visibleCount').textContent = visiblePapers;
     document.getElementById('totalCount').textContent = totalPapers;
@@ -118,11 +119,6 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Add scroll listener
     window.addEventListener('scroll', updateScrollProgress);
-    
-    // Override the existing filterPapers function to update filter status
-    const originalFilterPapers = window.filterPapers;
-    window.filterPapers = function() {
-        originalFilterPapers();
-        updateFilterStatus();
-    };
+
+    // filterRunner calls updateFilterStatus once each filter result is on the page.
 });
\ No newline at end of file
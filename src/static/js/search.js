@@ -0,0 +1,91 @@
+// Word-prefix search over the index written by search_index.SearchIndex. Papers are
+// numbered in page order, which is also the order of window.paperIndex, so a match is a
+// bitset (see bitset.js) indexed like paperIndex.
+const searchIndex = {
+    terms: null,      // every word in titles and authors, sorted
+    postings: null,   // per term: gap-encoded ordinals, decoded on first use
+    decoded: [],
+    count: 0,
+    masks: new Map(), // query word -> bitset, for the words of recent queries
+
+    // data is the JSON written by search_index.SearchIndex.
+    init(data) {
+        this.terms = data.terms;
+        this.postings = data.postings;
+        this.decoded = [];
+        this.count = data.count;
+        this.masks.clear();
+    },
+
+    // Same split as search_index.tokenize.
+    tokenize(text) {
+        return text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+    },
+
+    // Index of the first term that sorts at or after prefix.
+    lowerBound(prefix) {
+        let lo = 0;
+        let hi = this.terms.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (this.terms[mid] < prefix) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    },
+
+    postingsOf(i) {
+        let list = this.decoded[i];
+        if (!list) {
+            // Comma-separated base-36 gaps, parsed by hand: several times faster than
+            // split() and parseInt() on the long lists of common words.
+            const s = this.postings[i];
+            let n = 1;
+            for (let c = 0; c < s.length; c++) if (s.charCodeAt(c) === 44) n++;
+            list = new Uint32Array(n);
+            let ordinal = 0;
+            let gap = 0;
+            let j = 0;
+            for (let c = 0; c < s.length; c++) {
+                const code = s.charCodeAt(c);
+                if (code === 44) {
+                    ordinal += gap;
+                    list[j++] = ordinal;
+                    gap = 0;
+                } else {
+                    gap = gap * 36 + (code < 58 ? code - 48 : code - 87);
+                }
+            }
+            list[j] = ordinal + gap;
+            this.decoded[i] = list;
+        }
+        return list;
+    },
+
+    // Papers with at least one word starting with prefix.
+    prefixMask(prefix) {
+        let mask = this.masks.get(prefix);
+        if (mask) return mask;
+        mask = bitset.empty(this.count);
+        for (let i = this.lowerBound(prefix); i < this.terms.length && this.terms[i].startsWith(prefix); i++) {
+            const list = this.postingsOf(i);
+            for (let j = 0; j < list.length; j++) bitset.set(mask, list[j]);
+        }
+        if (this.masks.size >= 64) this.masks.clear();
+        this.masks.set(prefix, mask);
+        return mask;
+    },
+
+    // Bitset of the papers where every query word starts some word of the title or
+    // authors, or null when the query has no words (everything matches).
+    match(query) {
+        const words = this.tokenize(query);
+        if (!words.length) return null;
+        // A word that is a prefix of another query word adds no constraint.
+        const needed = words.filter(w => !words.some(o => o !== w && o.startsWith(w)));
+        const masks = [...new Set(needed)].map(w => this.prefixMask(w));
+        if (masks.length === 1) return masks[0];
+        const result = masks[0].slice();
+        for (let m = 1; m < masks.length; m++) bitset.and(result, masks[m]);
+        return result;
+    }
+};
@@ -79,33 +79,9 @@ function clearSelection() {
 
 function togglePaperSelection(paperId, checkbox) {
     if (!state.isSelectionMode) return;
-    
-    const paperCard = checkbox.closest('.paper-card');
-    const paperRow = paperCard.closest('.paper-row');
 
     if (checkbox.checked) {
-        // Add to selection
-        state.selectedPapers.add(paperId);
-        paperCard.classList.add('selected');
-
-        // Create preview item
-        const title = paperRow.getAttribute('data-title');
-        const authors = paperRow.getAttribute('data-authors');
-        const year = paperRow.getAttribute('data-year');
-
-        const previewItem = document.createElement('div');
-        previewItem.className = 'preview-item';
-        previewItem.setAttribute('data-paper-id', paperId);
-        previewItem.innerHTML = `
-            <div class="preview-content" onclick="scrollToPaper('${paperId}')">
-                <div class="preview-title">${title} (${year})</div>
-                <div class="preview-authors">${authors}</div>
-            </div>
-            <button class="preview-remove" onclick="event.stopPropagation(); removeFromSelection('${paperId}')">
-                <svg class="icon" viewBox="0 0 24 24" aria-hidden="true"><path d="M18 6 6 18M6 6l12 12"/></svg>
-            </button>
-        `;
-        document.getElementById('selectionPreview').appendChild(previewItem);
+        addToSelection(paperId);
     } else {
         removeFromSelection(paperId);
     }
@@ -116,28 +92,59 @@ function togglePaperSelection(paperId, checkbox) {
     updateURL();
 }
 
+// Select a paper and add its preview item. Works from the paper index, so the paper's row
+// does not have to be rendered (it may not be, on a --virtualize build).
+function addToSelection(paperId) {
+    const paper = paperById(paperId);
+    if (!paper || state.selectedPapers.has(paperId)) return;
+
+    state.selectedPapers.add(paperId);
+    const paperRow = paperRowOf(paperId);
+    if (paperRow) {
+        paperRow.querySelector('.selection-checkbox').checked = true;
+        paperRow.querySelector('.paper-card').classList.add('selected');
+    }
+
+    // Create preview item
+    const title = paper.titleText;
+    const authors = paper.authorsText;
+    const year = paper.year;
+
+    const previewItem = document.createElement('div');
+    previewItem.className = 'preview-item';
+    previewItem.setAttribute('data-paper-id', paperId);
+    previewItem.innerHTML = `
+        <div class="preview-content" onclick="scrollToPaper('${paperId}')">
+            <div class="preview-title">${title} (${year})</div>
+            <div class="preview-authors">${authors}</div>
+        </div>
+        <button class="preview-remove" onclick="event.stopPropagation(); removeFromSelection('${paperId}')">
+            <svg class="icon" viewBox="0 0 24 24" aria-hidden="true"><path d="M18 6 6 18M6 6l12 12"/></svg>
+        </button>
+    `;
+    document.getElementById('selectionPreview').appendChild(previewItem);
+}
+
 function removeFromSelection(paperId) {
-    const checkbox = document.querySelector(`.paper-row[data-id="${paperId}"] .selection-checkbox`);
-    if (checkbox) {
-        checkbox.checked = false;
-        state.selectedPapers.delete(paperId);
+    if (!paperById(paperId)) return;
+    state.selectedPapers.delete(paperId);
 
-        const paperCard = checkbox.closest('.paper-card');
-        if (paperCard) {
-            paperCard.classList.remove('selected');
-        }
+    const paperRow = paperRowOf(paperId);
+    if (paperRow) {
+        paperRow.querySelector('.selection-checkbox').checked = false;
+        paperRow.querySelector('.paper-card').classList.remove('selected');
+    }
 
-        const previewItem = document.querySelector(`.preview-item[data-paper-id="${paperId}"]`);
-        if (previewItem) {
-            previewItem.remove();
-        }
+    const previewItem = document.querySelector(`.preview-item[data-paper-id="${paperId}"]`);
+    if (previewItem) {
+        previewItem.remove();
+    }
 
-        updateSelectionCount();
-        if (state.onlyShowSelected) {
-            filterPapers();
-        }
-        updateURL();
+    updateSelectionCount();
+    if (state.onlyShowSelected) {
+        filterPapers();
     }
+    updateURL();
 }
 
 function updateSelectionCount() {
@@ -151,7 +158,9 @@ function handleCheckboxClick(ev, paperId, checkbox) {
 }
 
 function scrollToPaper(paperId) {
-    const paperRow = document.querySelector(`.paper-row[data-id="${paperId}"]`);
+    // A windowed list only has rows near the viewport; jump there first so the row exists.
+    if (state.virtual && !virtualList.reveal(paperId)) return;
+    const paperRow = paperRowOf(paperId);
     if (paperRow) {
         paperRow.scrollIntoView({ behavior: 'smooth', block: 'center' });
         
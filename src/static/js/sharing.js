@@ -61,16 +61,8 @@ function applyURLParams() {
             }
             
             // Select the papers first
-            arr.forEach(id => {
-                const row = document.querySelector(`.paper-row[data-id="${id}"]`);
-                if (row) {
-                    const cb = row.querySelector('.selection-checkbox');
-                    if (cb) {
-                        cb.checked = true;
-                        togglePaperSelection(id, cb);
-                    }
-                }
-            });
+            arr.forEach(id => addToSelection(id));
+            updateSelectionCount();
             
             // Then check if we should show only selected papers
             const showSelected = params.get('show_selected');
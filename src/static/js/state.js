@@ -3,5 +3,7 @@ const state = {
     isSelectionMode: false,
     includeTags: new Set(),
     excludeTags: new Set(),
-    onlyShowSelected: false
+    onlyShowSelected: false,
+    virtual: false,
+    visibleCount: 0
 };
\ No newline at end of file
@@ -1,17 +1,71 @@
 // Read each row's filterable fields once instead of re-reading and re-parsing
-// data-tags for every row on every keystroke.
+// data-tags for every row on every keystroke. A --virtualize build has no rows to
+// read; its entries come from the JSON payload and are rendered by virtualList.
 function buildPaperIndex() {
-    window.paperIndex = Array.from(document.querySelectorAll('.paper-row')).map(row => ({
-        row,
-        id: row.getAttribute('data-id'),
-        title: row.getAttribute('data-title').toLowerCase(),
-        authors: row.getAttribute('data-authors').toLowerCase(),
-        year: row.getAttribute('data-year'),
-        tags: JSON.parse(row.getAttribute('data-tags'))
-    }));
+    const payload = document.getElementById('paper-data');
+    if (payload) {
+        const { rows, tags } = JSON.parse(payload.textContent);
+        state.virtual = true;
+        window.paperIndex = rows.map((r, ordinal) => {
+            const data = paperFromRow(r, tags);
+            const titleText = stripTags(data.title);
+            const authorsText = stripTags(data.authors);
+            return {
+                row: null,
+                data,
+                ordinal,
+                id: data.id,
+                titleText,
+                authorsText,
+                title: titleText.toLowerCase(),
+                authors: authorsText.toLowerCase(),
+                year: data.year,
+                tags: data.tags,
+                visible: true,
+                height: 0
+            };
+        });
+    } else {
+        window.paperIndex = Array.from(document.querySelectorAll('.paper-row')).map((row, ordinal) => ({
+            row,
+            ordinal,
+            id: row.getAttribute('data-id'),
+            titleText: row.getAttribute('data-title'),
+            authorsText: row.getAttribute('data-authors'),
+            title: row.getAttribute('data-title').toLowerCase(),
+            authors: row.getAttribute('data-authors').toLowerCase(),
+            year: row.getAttribute('data-year'),
+            tags: JSON.parse(row.getAttribute('data-tags')),
+            visible: true
+        }));
+    }
+    window.paperMap = new Map(window.paperIndex.map(p => [p.id, p]));
+    state.visibleCount = window.paperIndex.length;
     return window.paperIndex;
 }
 
+function paperById(id) {
+    if (!window.paperIndex) buildPaperIndex();
+    return window.paperMap.get(id);
+}
+
+// The rendered row of a paper, if it currently exists in the DOM.
+function paperRowOf(id) {
+    const paper = paperById(id);
+    return paper ? (paper.row || (state.virtual && virtualList.rows.get(id)) || null) : null;
+}
+
+// Push the visible flags of the papers at the ordinals in changed to the page: hide
+// those rows in place, or hand the visible entries to the windowed list. Row numbers
+// follow by themselves (a CSS counter, or the windowed list's own numbering).
+function applyVisibility(papers, changed) {
+    if (state.virtual) {
+        virtualList.setItems(papers.filter(p => p.visible));
+    } else {
+        changed.forEach(i => papers[i].row.classList.toggle('hidden', !papers[i].visible));
+    }
+}
+
 // Single place that keeps a tag button's class, pressed state and label in sync.
 function setTagState(el, mode) {
     if (!el) return;
@@ -20,7 +74,9 @@ function setTagState(el, mode) {
     el.setAttribute('aria-pressed', mode === 'include' ? 'true' : 'false');
     const tag = el.getAttribute('data-tag');
     const described = mode === 'include' ? 'included' : mode === 'exclude' ? 'excluded' : 'not filtered';
-    el.setAttribute('aria-label', `${tag}: ${described}`);
+    const count = el.querySelector('.tag-filter-count');
+    const papers = count && count.textContent ? `, ${count.textContent} papers` : '';
+    el.setAttribute('aria-label', `${tag}: ${described}${papers}`);
 }
 
 function tagStateOf(el) {
@@ -63,12 +119,4 @@ function updateURL() {
         '',
         `${window.location.pathname}${newSearch}`
     );
-}
-
-function updatePaperNumbers() {
-    let num = 1;
-    document.querySelectorAll('.paper-row:not(.hidden)').forEach(row => {
-        const numElem = row.querySelector('.paper-number');
-        numElem.textContent = num++;
-    });
 }
\ No newline at end of file
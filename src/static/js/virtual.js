@@ -0,0 +1,139 @@
+// Windowed list for pages built with `generate.py --virtualize`. Only the rows in or near
+// the viewport exist in the DOM; a spacer above and below stands in for the rest, sized
+// from measured row heights (or an estimate for rows not rendered yet), so the scrollbar
+// and scroll position stay truthful.
+const virtualList = {
+    grid: null,
+    topSpacer: null,
+    bottomSpacer: null,
+    items: [],                     // visible index entries, in display order
+    offsets: new Float64Array(1),  // offsets[i] = distance from list top to items[i]
+    rows: new Map(),               // paper id -> rendered .paper-row
+    estimate: 320,                 // refined to the running mean of measured rows
+    measuredTotal: 0,
+    measuredCount: 0,
+    frame: 0,
+
+    init(grid) {
+        this.grid = grid;
+        grid.classList.add('virtual');
+        this.topSpacer = document.createElement('div');
+        this.bottomSpacer = document.createElement('div');
+        this.topSpacer.className = 'virtual-spacer';
+        this.bottomSpacer.className = 'virtual-spacer';
+        grid.append(this.topSpacer, this.bottomSpacer);
+
+        window.addEventListener('scroll', () => this.schedule(), { passive: true });
+        window.addEventListener('resize', () => {
+            // Width changes re-wrap every card; measurements are stale.
+            this.items.forEach(p => { p.height = 0; });
+            this.reflow();
+            this.schedule();
+        });
+        // Opening an abstract changes the row's height. toggle does not bubble, so capture it.
+        grid.addEventListener('toggle', () => this.schedule(), true);
+    },
+
+    setItems(items) {
+        this.items = items;
+        this.reflow();
+        this.render();
+    },
+
+    reflow() {
+        const n = this.items.length;
+        if (this.offsets.length !== n + 1) this.offsets = new Float64Array(n + 1);
+        for (let i = 0; i < n; i++) {
+            this.offsets[i + 1] = this.offsets[i] + (this.items[i].height || this.estimate);
+        }
+    },
+
+    schedule() {
+        if (this.frame) return;
+        this.frame = requestAnimationFrame(() => {
+            this.frame = 0;
+            this.render();
+        });
+    },
+
+    // First index whose row ends below y.
+    indexAt(y) {
+        let lo = 0;
+        let hi = this.items.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (this.offsets[mid + 1] > y) hi = mid; else lo = mid + 1;
+        }
+        return lo;
+    },
+
+    listTop() {
+        return this.topSpacer.getBoundingClientRect().top + window.scrollY;
+    },
+
+    render() {
+        if (!this.grid) return;
+        const n = this.items.length;
+        const viewTop = window.scrollY - this.listTop();
+        const overscan = window.innerHeight;
+        const start = Math.min(n, this.indexAt(Math.max(0, viewTop - overscan)));
+        const end = Math.min(n, this.indexAt(viewTop + window.innerHeight + overscan) + 1);
+
+        const wanted = new Set();
+        for (let i = start; i < end; i++) wanted.add(this.items[i].id);
+        this.rows.forEach((row, id) => {
+            if (!wanted.has(id)) {
+                row.remove();
+                this.rows.delete(id);
+            }
+        });
+
+        let previous = this.topSpacer;
+        for (let i = start; i < end; i++) {
+            const paper = this.items[i];
+            let row = this.rows.get(paper.id);
+            if (!row) {
+                row = createPaperRow(paper);
+                this.rows.set(paper.id, row);
+            }
+            if (previous.nextSibling !== row) previous.after(row);
+            row.querySelector('.paper-number').textContent = i + 1;
+            previous = row;
+        }
+
+        // Measure what was just laid out; one forced layout for the whole window.
+        let changed = false;
+        for (let i = start; i < end; i++) {
+            const paper = this.items[i];
+            const row = this.rows.get(paper.id);
+            const height = row.offsetHeight + parseFloat(getComputedStyle(row).marginBottom);
+            if (height !== paper.height) {
+                if (!paper.height) {
+                    this.measuredTotal += height;
+                    this.measuredCount += 1;
+                }
+                paper.height = height;
+                changed = true;
+            }
+        }
+        if (changed) {
+            this.estimate = this.measuredTotal / this.measuredCount;
+            this.reflow();
+        }
+
+        this.topSpacer.style.height = `${this.offsets[start]}px`;
+        this.bottomSpacer.style.height = `${this.offsets[n] - this.offsets[end]}px`;
+        // Real heights may leave the window short of the viewport; go again next frame.
+        if (changed) this.schedule();
+    },
+
+    // Bring a paper's row into the DOM near the middle of the viewport.
+    reveal(paperId) {
+        const i = this.items.findIndex(p => p.id === paperId);
+        if (i < 0) return false;
+        const top = this.listTop() + this.offsets[i] - window.innerHeight / 2;
+        window.scrollTo({ top: Math.max(0, top), behavior: 'instant' });
+        this.render();
+        return true;
+    }
+};
@@ -1,12 +1,104 @@
+import hashlib
 from string import Template as StringTemplate
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, TextIO, Tuple
 from pathlib import Path
 
-class TemplateEngine:
-    def __init__(self, template_path: Path):
+class CompiledTemplate:
+    """A template pre-split into literal segments with the placeholder slots between them.
+
+    Rendering copies the segment list, drops each value into its slot and joins once, which
+    skips the per-render regex scan of string.Template. Placeholder syntax and error types
+    follow string.Template: $name, ${name}, $$ for a literal dollar, KeyError for a missing
+    value, ValueError for a malformed placeholder.
+    """
+    __slots__ = ('parts', 'slots')
+
+    def __init__(self, parts: List[str], slots: List[Tuple[int, str]]):
+        self.parts = parts
+        self.slots = slots
+
+    @classmethod
+    def compile(cls, source: str) -> 'CompiledTemplate':
+        parts: List[str] = []
+        slots: List[Tuple[int, str]] = []
+        literal = []
+        pos = 0
+        for match in StringTemplate.pattern.finditer(source):
+            literal.append(source[pos:match.start()])
+            pos = match.end()
+            name = match.group('named') or match.group('braced')
+            if name is not None:
+                parts.append(''.join(literal))
+                literal = []
+                slots.append((len(parts), name))
+                parts.append('')
+            elif match.group('escaped') is not None:
+                literal.append(StringTemplate.delimiter)
+            else:
+                line = source.count('\n', 0, match.start('invalid')) + 1
+                raise ValueError(f'Invalid placeholder in string: line {line}')
+        literal.append(source[pos:])
+        parts.append(''.join(literal))
+        return cls(parts, slots)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        parts = self.parts.copy()
+        for index, name in self.slots:
+            parts[index] = str(context[name])
+        return ''.join(parts)
+
+    def split(self, name: str) -> Tuple['CompiledTemplate', 'CompiledTemplate']:
+        """Split at the first placeholder ``name`` into a head and a tail template."""
+        for index, slot_name in self.slots:
+            if slot_name == name:
+                head = CompiledTemplate(self.parts[:index], [s for s in self.slots if s[0] < index])
+                tail = CompiledTemplate(self.parts[index + 1:],
+                                        [(i - index - 1, n) for i, n in self.slots if i > index])
+                return head, tail
+        raise KeyError(name)
+
+# Per-process caches: template text by file identity, compiled form by content hash.
+_SOURCES: Dict[Tuple[str, int, int], Tuple[str, str]] = {}
+_COMPILED: Dict[str, CompiledTemplate] = {}
+
+def _load_source(template_path: Path) -> Tuple[str, str]:
+    """Return (text, sha256) of a template, read from disk only when the file changed."""
+    stat = Path(template_path).stat()
+    key = (str(Path(template_path).resolve()), stat.st_mtime_ns, stat.st_size)
+    if key not in _SOURCES:
         with open(template_path, 'r', encoding='utf-8') as f:
-            self.template = StringTemplate(f.read())
+            text = f.read()
+        _SOURCES[key] = (text, hashlib.sha256(text.encode('utf-8')).hexdigest())
+    return _SOURCES[key]
+
+class TemplateEngine:
+    def __init__(self, template_path: Path, compiled: bool = True):
+        source, self.digest = _load_source(template_path)
+        self.template = StringTemplate(source)
+        self.compiled = compiled
+        if self.digest not in _COMPILED:
+            _COMPILED[self.digest] = CompiledTemplate.compile(source)
+        self.program = _COMPILED[self.digest]
     
     def render(self, context: Dict[str, Any]) -> str:
         """Render the template with the given context."""
-        return self.template.substitute(context)
\ No newline at end of file
+        if self.compiled:
+            return self.program.render(context)
+        return self.template.substitute(context)
+
+    def render_to(self, out: TextIO, context: Dict[str, Any], name: str,
+                  items: Iterable[str], separator: str = "\n") -> None:
+        """Write the template to ``out`` with the placeholder ``name`` filled from ``items``.
+
+        The head is written before the first item is drawn and each item goes straight to
+        ``out``, so the page never exists as one string. The tail is rendered only after
+        the items are exhausted, so values gathered while they stream can still be put
+        into ``context``.
+        """
+        head, tail = self.program.split(name)
+        out.write(head.render(context))
+        for i, item in enumerate(items):
+            if i:
+                out.write(separator)
+            out.write(item)
+        out.write(tail.render(context))
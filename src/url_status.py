@@ -0,0 +1,75 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+DEFAULT_PATH = Path('.cache/url_status.sqlite')
+
+@dataclass
+class UrlStatus:
+    """Outcome of the last probe of one URL.
+
+    ``status`` is the HTTP status code, or the name of the exception when the request
+    failed. ``etag`` and ``last_modified`` are the validators for a conditional recheck.
+    """
+    url: str
+    status: Union[int, str]
+    final_url: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    checked_at: float = 0.0
+
+    def age(self) -> float:
+        return time.time() - self.checked_at
+
+class UrlStatusStore:
+    """SQLite record of URL probes, shared by check_links.py and validate_yaml.py.
+
+    With it a sweep only re-probes URLs whose last check is older than a chosen age, and
+    the PR validator skips URLs the last sweep already found working.
+    """
+
+    def __init__(self, path: Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        # status has no declared type, so codes stay integers and error names text.
+        self._db.execute("""CREATE TABLE IF NOT EXISTS urls (
+            url TEXT PRIMARY KEY,
+            status,
+            final_url TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            checked_at REAL NOT NULL)""")
+        self._db.commit()
+
+    def get(self, url: str) -> Optional[UrlStatus]:
+        return self.get_many([url]).get(url)
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, UrlStatus]:
+        found = {}
+        with self._lock:
+            for url in urls:
+                row = self._db.execute(
+                    "SELECT url, status, final_url, etag, last_modified, checked_at "
+                    "FROM urls WHERE url = ?", (url,)).fetchone()
+                if row is not None:
+                    found[url] = UrlStatus(*row)
+        return found
+
+    def put(self, status: UrlStatus) -> None:
+        self.put_many([status])
+
+    def put_many(self, statuses: Iterable[UrlStatus]) -> None:
+        rows = [(s.url, s.status, s.final_url, s.etag, s.last_modified, s.checked_at)
+                for s in statuses]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -1,5 +1,10 @@
+import gzip
+import io
+import json
+import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List
+from typing import IO, Iterator, List, TextIO
 
 def read_files(base_dir: Path, file_paths: List[str]) -> List[str]:
     """Read multiple files and return their contents as a list."""
@@ -9,7 +14,44 @@ def read_files(base_dir: Path, file_paths: List[str]) -> List[str]:
             contents.append(f.read())
     return contents
 
+def script_json(value) -> str:
+    """Compact JSON that is safe to embed in a <script> element."""
+    # '</' would end the surrounding element early.
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+@contextmanager
+def atomic_write(path, mode: str = 'w') -> Iterator[IO]:
+    """Open ``path`` for writing through a temporary file that replaces it once complete.
+
+    Readers, and the next run after an interrupted one, see the old file or the whole new
+    one, never a truncated one. Text is written as UTF-8; use mode 'wb' for bytes.
+    """
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
 def write_output(output_file: str, content: str) -> None:
     """Write content to output file."""
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(content)
\ No newline at end of file
+        f.write(content)
+
+@contextmanager
+def open_output(output_file: str) -> Iterator[TextIO]:
+    """Open an output file for streaming text; a ``.gz`` name is written gzip-compressed.
+
+    The gzip header carries no timestamp, so an unchanged page compresses to identical bytes.
+    """
+    if not str(output_file).endswith('.gz'):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            yield f
+        return
+    with open(output_file, 'wb') as raw, \
+            gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=9, mtime=0) as gz, \
+            io.TextIOWrapper(gz, encoding='utf-8') as f:
+        yield f
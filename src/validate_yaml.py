@@ -1,4 +1,3 @@
-import yaml
 import sys
 import os
 import requests
@@ -6,6 +5,10 @@ import time
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
 from github import Github
+from host_profile import BLOCKED_CODES, HostProfile, HostProfiles
+from link_sweep import GLOBAL_LIMIT, SweepEngine, canonical_url, host_of
+from url_status import UrlStatus, UrlStatusStore
+from yaml_loader import load_papers, parse_papers
 
 # Configure requests for better reliability
 session = requests.Session()
@@ -15,7 +18,8 @@ retries = Retry(
     status_forcelist=[408, 429, 500, 502, 503, 504],
     allowed_methods=["HEAD", "GET"]
 )
-adapter = HTTPAdapter(max_retries=retries)
+# URLs are checked concurrently; keep a pool per host for every request in flight.
+adapter = HTTPAdapter(max_retries=retries, pool_connections=64, pool_maxsize=GLOBAL_LIMIT)
 session.mount('http://', adapter)
 session.mount('https://', adapter)
 
@@ -36,21 +40,47 @@ allowed_tags = [
     "Virtual Reality", "World Generation"
 ]
 
-def validate_url(url, required=False):
+# URLs found working (by the link sweep or an earlier run) within this many seconds
+# are not probed again
+STATUS_MAX_AGE = 24 * 3600
+valid_codes = {200, 301, 302, 303, 307, 308}
+
+def validate_url(url, required=False, store=None, profiles=None):
     """Validate URL with fallback to GET if HEAD fails"""
     if not url:
         return None if not required else "URL is missing or empty"
-        
+
+    if store is not None:
+        known = store.get(canonical_url(url))
+        if known is not None and known.status in valid_codes and known.age() < STATUS_MAX_AGE:
+            print(f"{url}: checked {known.age() / 3600:.1f} hours ago, still fresh")
+            return None
+
+    host = host_of(url)
+    profile = profiles.get(host) if profiles else HostProfile(host)
     try:
-        # First try HEAD request
-        response = session.head(url, headers=headers, timeout=30, allow_redirects=True)
-        
+        # First try HEAD request, unless the host is known to answer it unlike GET
+        head_status = None
+        if profile.use_head():
+            response = session.head(url, headers=headers, timeout=30, allow_redirects=True)
+            head_status = response.status_code
+            if profiles:
+                profiles.record(host, response.elapsed.total_seconds(),
+                                head_ok=True if head_status in valid_codes else None)
+
         # If HEAD fails, try GET
-        if response.status_code in [405, 400, 403]:
+        if head_status is None or head_status in [405, 400, 403]:
             response = session.get(url, headers=headers, timeout=30, allow_redirects=True, stream=True)
             response.close()
+            if profiles:
+                profiles.record(host, response.elapsed.total_seconds(),
+                                head_ok=None if head_status is None else response.status_code == head_status,
+                                blocked=response.status_code in BLOCKED_CODES)
         
-        valid_codes = {200, 301, 302, 303, 307, 308}
+        if store is not None:
+            store.put(UrlStatus(canonical_url(url), response.status_code, response.url,
+                                response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                                time.time()))
         if response.status_code not in valid_codes:
             return f"URL returns {response.status_code}"
             
@@ -71,13 +101,12 @@ def get_changed_entries():
     pr = repo.get_pull(int(os.getenv('PR_NUMBER')))
     
     # Load both versions of the YAML file
-    with open("awesome_3dgs_papers.yaml", 'r') as file:
-        new_yaml = yaml.safe_load(file)
+    new_yaml = load_papers("awesome_3dgs_papers.yaml")
     
     try:
         # Get base content
         base_content = repo.get_contents("awesome_3dgs_papers.yaml", ref=pr.base.sha).decoded_content.decode()
-        base_yaml = yaml.safe_load(base_content)
+        base_yaml = parse_papers(base_content)
     except:
         # If file doesn't exist in base, all entries are new
         base_yaml = []
@@ -98,9 +127,14 @@ def get_changed_entries():
     
     return changed_entries
 
-def validate_entries(entries):
-    """Validate the specified entries"""
-    errors = []
+def validate_entries(entries, store=None, profiles=None):
+    """Validate the specified entries
+
+    URLs are checked concurrently once every entry has been read, paced per host by the
+    link sweep's limiter; errors are reported in entry and field order all the same.
+    """
+    # In order: error messages, and (entry id, field, url, required) still to be checked
+    pending = []
     url_fields = {
         'paper': True,
         'project_page': False,
@@ -109,8 +143,7 @@ def validate_entries(entries):
     }
 
     # Load full YAML to get entry numbers
-    with open("awesome_3dgs_papers.yaml", 'r') as file:
-        all_entries = yaml.safe_load(file)
+    all_entries = load_papers("awesome_3dgs_papers.yaml")
     
     # Create index lookup
     entry_indices = {entry['id']: idx + 1 for idx, entry in enumerate(all_entries)}
@@ -118,7 +151,7 @@ def validate_entries(entries):
     for entry in entries:
         # Basic validation
         if not entry.get('id'):
-            errors.append("Entry missing ID")
+            pending.append("Entry missing ID")
             continue
 
         entry_num = entry_indices.get(entry['id'], '?')
@@ -127,27 +160,47 @@ def validate_entries(entries):
         # Tags validation
         tags = entry.get('tags', [])
         if not tags:
-            errors.append(f"Entry {entry['id']}: No tags provided")
+            pending.append(f"Entry {entry['id']}: No tags provided")
         else:
             invalid_tags = [tag for tag in tags if not tag.startswith('Year ') and tag not in allowed_tags]
             if invalid_tags:
-                errors.append(f"Entry {entry['id']}: Invalid tags: {invalid_tags}")
+                pending.append(f"Entry {entry['id']}: Invalid tags: {invalid_tags}")
             
             non_year_tags = [tag for tag in tags if not tag.startswith('Year ')]
             if not non_year_tags:
-                errors.append(f"Entry {entry['id']}: Must have at least one non-Year tag")
+                pending.append(f"Entry {entry['id']}: Must have at least one non-Year tag")
 
         # URL validation
         for field, required in url_fields.items():
             value = entry.get(field)
             if value or required:
-                print(f"Checking {field} URL: {value}")
-                error = validate_url(value, required)
-                if error:
-                    errors.append(f"Entry {entry['id']}: {field} {error}")
-                # Add delay between requests
-                time.sleep(1)
+                print(f"Queued {field} URL: {value}")
+                pending.append((entry['id'], field, value, required))
+
+    # Check each distinct URL once, all at the same time but at a polite pace per host.
+    # The session retries failed requests itself.
+    urls = {}
+    for item in pending:
+        if isinstance(item, tuple) and item[2]:
+            urls.setdefault(canonical_url(str(item[2])), str(item[2]))
+
+    def check(key, timeout):
+        print(f"Checking URL: {urls[key]}")
+        return validate_url(urls[key], True, store, profiles)
 
+    engine = SweepEngine(check, lambda error: True, retries=0)
+    results = engine.run(urls)
+    print(f"\nChecked {len(urls)} distinct URLs")
+
+    errors = []
+    for item in pending:
+        if isinstance(item, str):
+            errors.append(item)
+            continue
+        entry_id, field, value, required = item
+        error = results[canonical_url(str(value))] if value else validate_url(value, required)
+        if error:
+            errors.append(f"Entry {entry_id}: {field} {error}")
     return errors
 
 def main():
@@ -158,7 +211,9 @@ def main():
             sys.exit(0)
 
         print(f"\nFound {len(changed_entries)} changed/new entries to validate")
-        errors = validate_entries(changed_entries)
+        profiles = HostProfiles()
+        errors = validate_entries(changed_entries, UrlStatusStore(), profiles)
+        profiles.save()
 
         if errors:
             print("\n❌ Validation errors found:")
@@ -1,5 +1,5 @@
 import sys
-from src.fix_date import YAMLUpdater
+from fix_date import YAMLUpdater
 import yaml
 import webbrowser
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
@@ -11,8 +11,9 @@ from PyQt6.QtCore import Qt
 from pathlib import Path
 from typing import Dict, Any
 
-from src.components.widgets import TagButton, URLWidget
-from src.components.dialogs import ArxivAddDialog
+from components.widgets import TagButton, URLWidget
+from components.dialogs import ArxivAddDialog
+from yaml_loader import load_papers
 
 class YAMLEditor(QMainWindow):
     def __init__(self):
@@ -85,8 +86,7 @@ class YAMLEditor(QMainWindow):
         """Load and sort YAML data with safe handling of missing or invalid values."""
         try:
             print("Loading YAML file")  # Debug print
-            with open("awesome_3dgs_papers.yaml", 'r', encoding='utf-8') as file:
-                self.data = yaml.safe_load(file)
+            self.data = load_papers("awesome_3dgs_papers.yaml")
             
             if not isinstance(self.data, list):
                 raise ValueError("YAML file does not contain a list of papers")
@@ -511,8 +511,7 @@ class YAMLEditor(QMainWindow):
             print("Dialog accepted, getting newly added entry")
             
             # Read the current YAML file
-            with open("awesome_3dgs_papers.yaml", 'r', encoding='utf-8') as file:
-                current_data = yaml.safe_load(file)
+            current_data = load_papers("awesome_3dgs_papers.yaml")
             
             # Get the newest entry and its ID before any modifications
             new_entry = current_data[-1]
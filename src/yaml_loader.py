@@ -0,0 +1,168 @@
+"""Shared loader for the paper database.
+
+Parsing awesome_3dgs_papers.yaml is the largest fixed cost of every tool in this repo and
+grows with the database. Loads go through libyaml when PyYAML was built with it, and the
+parsed entries are kept as a pickle snapshot next to the file so that a repeat load of an
+unchanged database is a deserialize rather than a parse.
+
+Both the parse and the snapshot are read one entry at a time, so ``iter_papers`` can feed
+a consumer without ever holding the whole database in memory.
+"""
+import hashlib
+import pickle
+from pathlib import Path
+from typing import Any, Iterator, Optional
+import yaml
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.events import SequenceEndEvent, SequenceStartEvent, StreamEndEvent
+from yaml.resolver import Resolver
+
+from utils import atomic_write
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+    from yaml.cyaml import CParser
+
+    class _EntryLoader(Composer, CParser, SafeConstructor, Resolver):
+        """libyaml events composed node by node, so entries can be built one at a time."""
+
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            Composer.__init__(self)
+            SafeConstructor.__init__(self)
+            Resolver.__init__(self)
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+    _EntryLoader = SafeLoader
+
+# Bump when the snapshot layout changes so old snapshots are ignored rather than misread.
+SNAPSHOT_VERSION = 2
+
+def parse_papers(text: str) -> Any:
+    """Parse YAML text with the fastest available safe loader."""
+    return yaml.load(text, Loader=SafeLoader)
+
+def _parse_entries(path: Path) -> Iterator[dict]:
+    """Yield the items of the top-level sequence in ``path`` as they are parsed."""
+    with open(path, 'rb') as f:
+        loader = _EntryLoader(f)
+        try:
+            loader.get_event()  # StreamStart
+            if loader.check_event(StreamEndEvent):
+                return
+            loader.get_event()  # DocumentStart
+            if not loader.check_event(SequenceStartEvent):
+                raise ValueError(f"{path} does not contain a list of papers")
+            loader.get_event()
+            while not loader.check_event(SequenceEndEvent):
+                yield loader.construct_document(loader.compose_node(None, None))
+        finally:
+            loader.dispose()
+
+def _snapshot_path(path: Path, snapshot_dir: Optional[Path]) -> Path:
+    directory = snapshot_dir if snapshot_dir is not None else path.parent / '.cache' / 'yaml'
+    return Path(directory) / f"{path.name}.pickle"
+
+def _read_header(snapshot: Path):
+    """Return (header, open file positioned at the first entry) or (None, None) if unusable."""
+    try:
+        f = open(snapshot, 'rb')
+    except OSError:
+        return None, None
+    try:
+        header = pickle.load(f)
+        if isinstance(header, dict) and header.get('version') == SNAPSHOT_VERSION:
+            return header, f
+    except Exception:
+        pass
+    f.close()
+    return None, None
+
+def _read_entries(f) -> Iterator[dict]:
+    while True:
+        try:
+            yield pickle.load(f)
+        except EOFError:
+            return
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class _SnapshotWriter:
+    """Pickles entries as they stream past and publishes the snapshot only if the stream completes."""
+
+    def __init__(self, snapshot: Path, header: dict):
+        self.snapshot = snapshot
+        self.header = header
+        self._writing = None
+        self.f = None
+
+    def __enter__(self):
+        try:
+            self.snapshot.parent.mkdir(parents=True, exist_ok=True)
+            self._writing = atomic_write(self.snapshot, 'wb')
+            self.f = self._writing.__enter__()
+            pickle.dump(self.header, self.f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            # A read-only checkout still loads correctly, just without the speed-up.
+            if self.f is not None:
+                self._writing.__exit__(type(e), e, e.__traceback__)
+            self.f = None
+        return self
+
+    def write(self, entry: Any) -> None:
+        if self.f is not None:
+            pickle.dump(entry, self.f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.f is None:
+            return
+        try:
+            self._writing.__exit__(exc_type, exc, tb)
+        except OSError:
+            pass
+
+def iter_papers(path, snapshot_dir: Optional[Path] = None) -> Iterator[dict]:
+    """Yield the entries of the YAML file at ``path`` one at a time.
+
+    The snapshot is keyed by the file's size, mtime and SHA-256. The content hash is
+    always checked, since a rewrite of the same size within the filesystem's mtime
+    granularity leaves size and mtime unchanged; a checkout that only touched the mtime
+    still reuses the snapshot, which is then rewritten with the new mtime. Each entry is a
+    fresh object, so callers are free to mutate what they receive.
+    """
+    path = Path(path)
+    snapshot = _snapshot_path(path, snapshot_dir)
+    stat = path.stat()
+
+    header, f = _read_header(snapshot)
+    digest = _file_digest(path)
+    if (f is not None and header['sha256'] == digest and header['size'] == stat.st_size
+            and header['mtime_ns'] == stat.st_mtime_ns):
+        with f:
+            yield from _read_entries(f)
+        return
+
+    fresh = {'version': SNAPSHOT_VERSION, 'size': stat.st_size,
+             'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+    try:
+        if f is not None and header['sha256'] == digest:
+            source = _read_entries(f)
+        else:
+            source = _parse_entries(path)
+        with _SnapshotWriter(snapshot, fresh) as writer:
+            for entry in source:
+                writer.write(entry)
+                yield entry
+    finally:
+        if f is not None:
+            f.close()
+
+def load_papers(path, snapshot_dir: Optional[Path] = None) -> list:
+    """Load every entry of the YAML file at ``path`` into a list."""
+    return list(iter_papers(path, snapshot_dir))